@@ -2,6 +2,7 @@ import json
 import os
 import sys
 
+from automations.sharding import ShardScheduler
 from automations.utils.log import Log
 
 # Sauce OS strings
@@ -30,6 +31,9 @@ def browsers(browsers, direct=False):
 	Set env var EXTENDED_DEBUG=1 to request extended debugging from Sauce Labs:
 	https://wiki.saucelabs.com/pages/viewpage.action?pageId=70072943
 
+	Generated classes are registered with the ShardScheduler, see
+	automations.sharding.
+
 	Args:
 		browsers ([]): array of platform definitions to be used
 	"""
@@ -66,6 +70,7 @@ def browsers(browsers, direct=False):
 				'_testClassName': name
 			}
 			setattr(module, name, type(name, (base_class,), d))
+			ShardScheduler.register(base_class.__module__, name, browser)
 
 		return base_class
 	return decorator
@@ -10,6 +10,24 @@ config = {
 
                 "use_sauce": bool(int(os.environ.get('USE_SAUCE', 0))),
                 "use_pandora": bool(int(os.environ.get('USE_PANDORA', 0))),
+                "shared_chromedriver": bool(int(os.environ.get('SHARED_CHROMEDRIVER', 1))),
+                "chrome_profile": os.environ.get('CHROME_PROFILE', 'default'),
+                "chrome_window_size": os.environ.get('CHROME_WINDOW_SIZE', '1366,768'),
+                "chrome_block_images": bool(int(os.environ.get('CHROME_BLOCK_IMAGES', 0))),
+                "launch_attempts": int(os.environ.get('LAUNCH_ATTEMPTS', 3)),
+                "launch_backoff": float(os.environ.get('LAUNCH_BACKOFF', 2)),
+                "launch_concurrency": int(os.environ.get('LAUNCH_CONCURRENCY', 0)),
+                "teardown_concurrency": int(os.environ.get('TEARDOWN_CONCURRENCY', 0)),
+                "teardown_timeout": float(os.environ.get('TEARDOWN_TIMEOUT', 60)),
+                "pooled_transport": bool(int(os.environ.get('POOLED_TRANSPORT', 1))),
+                "command_pool_size": int(os.environ.get('COMMAND_POOL_SIZE', 10)),
+                "command_connect_timeout": float(os.environ.get('COMMAND_CONNECT_TIMEOUT', 10)),
+                "command_read_timeout": float(os.environ.get('COMMAND_READ_TIMEOUT', 300)),
+                "command_retries": int(os.environ.get('COMMAND_RETRIES', 2)),
+                "use_session_pool": bool(int(os.environ.get('USE_SESSION_POOL', 0))),
+                "session_pool_max_uses": int(os.environ.get('SESSION_POOL_MAX_USES', 20)),
+                "profile_template": bool(int(os.environ.get('PROFILE_TEMPLATE', 0))),
+                "profile_warm_urls": os.environ.get('PROFILE_WARM_URLS', "{{url_evpn_login}}"),
                 "pandora_account_type": os.environ.get('PANDORA_ACCOUNT_TYPE', os.environ.get('HO_ENV')),
                 "url_evpn_login": "{{url_evpn}}/sign-in",
 
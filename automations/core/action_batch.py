@@ -0,0 +1,187 @@
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.command import Command
+
+from automations.core.base_element import TIMEOUT, debug
+from automations.core.dom_observer import DomObserver
+from automations.utils.log import Log
+
+
+class ActionBatch(object):
+	"""Queues element interactions and performs them as a single action chain
+	(one W3C Actions command) when the batch exits.
+
+	Usage:
+		with section.batch():
+			section.field.click()
+			section.field.send_keys("text", Keys.TAB)
+			section.item.drag_to(section.target)
+
+	Elements are located when the batch is performed, all elements in a batch
+	must be in the same frame. Keys are
+	typed into the focused element as the unbatched send_keys does (no click),
+	an element that isn't the one last clicked or typed into is focused first,
+	which splits the chain at that point.
+
+	If the elements can't be verified when the batch is performed nothing has
+	been sent, so the actions are replayed individually with the standard
+	verify and retry handling. A failure while the chain is performed is
+	raised, as the earlier ticks have already been dispatched.
+
+	Actions that can't be batched (e.g. set_text, clear, submit) perform the
+	actions queued so far before they run, so the order is kept.
+	"""
+
+	def __init__(self, driver):
+		"""New batch.
+
+		Args:
+			driver (WebDriver): the driver the actions are performed with
+		"""
+		self.driver = driver
+		self.actions = []
+		self.outer = None
+
+	@classmethod
+	def active(cls, driver):
+		"""Get the batch collecting actions for a driver.
+
+		Returns:
+			ActionBatch: the active batch, or None
+		"""
+		return getattr(driver, '_action_batch', None)
+
+	def __enter__(self):
+		self.outer = self.active(self.driver)
+		if not self.outer:
+			setattr(self.driver, '_action_batch', self)
+		return self
+
+	def __exit__(self, exc_type, exc_value, trace):
+		if self.outer:
+			# nested batches join the outer batch
+			self.outer.actions.extend(self.actions)
+			return False
+		setattr(self.driver, '_action_batch', None)
+		if exc_type is None:
+			self.flush()
+		return False
+
+	@classmethod
+	def flush_active(cls, driver):
+		"""Perform the actions queued by the active batch for a driver (if
+		any), before an action that can't be batched.
+
+		Args:
+			driver (WebDriver): the driver
+		"""
+		batch = cls.active(driver)
+		if batch is None or not batch.actions:
+			return
+		# a replay must not queue the actions again
+		setattr(driver, '_action_batch', None)
+		try:
+			batch.flush()
+		finally:
+			setattr(driver, '_action_batch', batch)
+
+	def add(self, name, element, *args, **kwargs):
+		"""Queue an action, the element(s) are located when it's performed.
+
+		Args:
+			name (str): the action (click, send_keys, move_to or drag_to)
+			element (Element): the element acted on
+			args: keys for send_keys, the target element for drag_to
+			timeout (int): max time to wait for the element(s)
+			retry (RetryPolicy): policy for the action if it's replayed
+		"""
+		self.actions.append((name, element, args,
+			kwargs.get('timeout', TIMEOUT), kwargs.get('retry')))
+
+	def flush(self):
+		"""Perform all queued actions as one action chain (or more when an
+		element has to be focused for send_keys).
+		"""
+		actions = self.actions
+		self.actions = []
+		if not actions:
+			return
+		Log.logger.info("{}Perform {} batched actions: [{}]".format(
+			actions[0][1]._log_prefix(), len(actions), ", ".join(
+				"{} {}".format(name, element._name())
+				for name, element, _, _, _ in actions)))
+
+		try:
+			try:
+				segments = self._segments(actions)
+			except WebDriverException as ex:
+				# nothing has been dispatched yet
+				debug("Batched actions failed verify, replaying individually: "
+					"{}".format(ex))
+				self._replay(actions)
+				return
+
+			DomObserver.for_driver(self.driver).touch()
+			try:
+				for focus, chain in segments:
+					if focus is not None:
+						self.driver.execute_script("arguments[0].focus();",
+							focus)
+					chain.perform()
+			except WebDriverException:
+				if getattr(self.driver, 'w3c', False):
+					try:
+						self.driver.execute(Command.W3C_CLEAR_ACTIONS)
+					except WebDriverException:
+						pass
+				raise
+		finally:
+			for _, element, _, _, _ in actions:
+				element._web_element_state = None
+
+	def _segments(self, actions):
+		"""Locate the elements and build the action chains.
+
+		Returns:
+			[(WebElement, ActionChains)]: each chain with the element to focus
+				before it's performed (or None)
+		"""
+		segments = []
+		chain = None
+		focused = None
+		for name, element, args, timeout, _ in actions:
+			element.verify(timeout=timeout)
+			web_element = element.web_element
+			focus = None
+			if name == 'send_keys' and focused != web_element:
+				focus = web_element
+			if chain is None or focus is not None:
+				chain = ActionChains(self.driver)
+				segments.append((focus, chain))
+
+			if name == 'click':
+				chain.click(web_element)
+				focused = web_element
+			elif name == 'send_keys':
+				chain.send_keys(*args)
+				focused = web_element
+			elif name == 'move_to':
+				chain.move_to_element(web_element)
+			elif name == 'drag_to':
+				args[0].verify(timeout=timeout)
+				chain.drag_and_drop(web_element, args[0].web_element)
+				focused = None
+		return segments
+
+	def _replay(self, actions):
+		"""Perform the actions one at a time.
+		"""
+		for name, element, args, timeout, retry in actions:
+			if name == 'click':
+				element.click(timeout=timeout, retry=retry)
+			elif name == 'send_keys':
+				element.send_keys(*args, retry=retry)
+			elif name == 'move_to':
+				element.move_to(timeout=timeout, retry=retry)
+			elif name == 'drag_to':
+				element.drag_to(args[0], timeout=timeout, retry=retry)
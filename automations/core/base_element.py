@@ -1,4 +1,5 @@
 import logging
+import os
 import re
 import time
 import traceback
@@ -8,11 +9,18 @@ from selenium.common.exceptions import (
 	InvalidElementStateException,
 	NoSuchElementException,
 	StaleElementReferenceException,
-	TimeoutException
+	TimeoutException,
+	WebDriverException
 )
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 
+from automations.core import scripts
+from automations.core.dom_observer import DomObserver
+from automations.core.frame_context import FrameContext
+from automations.core.selectors import SelectorCompiler
+from automations.core.polling import PollScheduler
+from automations.core.templates import LocatorTemplate
 from automations.utils.log import Log
 
 TIMEOUT = 30
@@ -22,6 +30,17 @@ DEBUG = False
 """
 DEFAULT_ATTR_ID = "data-test-id"
 
+"""Wait on page DOM changes between wait attempts rather than fixed ticks,
+set env var EVENT_WAITS=1 to enable.
+"""
+EVENT_WAITS = bool(int(os.environ.get('EVENT_WAITS', 0)))
+
+"""Reuse located web elements without re-checking their conditions while the
+page reports an unchanged DOM (see DomObserver), set env var DOM_CACHE=1 to
+enable.
+"""
+DOM_CACHE = bool(int(os.environ.get('DOM_CACHE', 0)))
+
 logger = logging.getLogger("LOG") # outputs to main console during Jenkins runs
 
 def debug(msg):
@@ -37,11 +56,13 @@ class EC():
 	def __init__(self):
 		self.conditions = []
 		self._description = []
+		self._keys = []
 
 	def copy(self):
 		ec = EC()
 		ec.conditions = list(self.conditions)
 		ec._description = list(self._description)
+		ec._keys = list(self._keys)
 		return ec
 
 	def visible(self):
@@ -49,6 +70,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: element.is_displayed())
 		self._description.append("VISIBLE")
+		self._keys.append(("visible",))
 		return self
 
 	def invisible(self):
@@ -56,6 +78,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: not element.is_displayed())
 		self._description.append("INVISIBLE")
+		self._keys.append(("invisible",))
 		return self
 
 	def enabled(self):
@@ -63,6 +86,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: element.is_enabled())
 		self._description.append("ENABLED")
+		self._keys.append(("enabled",))
 		return self
 
 	def disabled(self):
@@ -70,6 +94,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: not element.is_enabled())
 		self._description.append("DISABLED")
+		self._keys.append(("disabled",))
 		return self
 
 	def clickable(self):
@@ -77,6 +102,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: element.is_displayed() and element.is_enabled())
 		self._description.append("CLICKABLE")
+		self._keys.append(("clickable",))
 		return self
 
 	def selected(self):
@@ -84,6 +110,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: element.is_selected())
 		self._description.append("SELECTED")
+		self._keys.append(("selected",))
 		return self
 
 	def not_selected(self):
@@ -91,6 +118,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: not element.is_selected())
 		self._description.append("NOT SELECTED")
+		self._keys.append(("not_selected",))
 		return self
 
 	def text(self, text):
@@ -101,6 +129,7 @@ class EC():
 		"""
 		self.conditions.append(lambda element: element.is_displayed() and text in element.text)
 		self._description.append("TEXT:'{}'".format(text))
+		self._keys.append(("text", text))
 		return self
 
 	def _count(self):
@@ -111,29 +140,54 @@ class EC():
 		"""
 		return len(self.conditions)
 
-	def _evaluate_for(self, element):
-		"""Evaluate the list of elements for all conditions, returning an array of all elements that pass all conditions.
+	def _script_keys(self):
+		"""Get the conditions in a form that can be evaluated in the browser.
+
+		Returns:
+			[[str]]: condition keys, or None if any condition is Python-only
+				(e.g. a custom lambda)
+		"""
+		if len(self._keys) != len(self.conditions):
+			return None
+		return [list(key) for key in self._keys]
+
+	def _evaluate_for(self, element, driver=None):
+		"""Evaluate all conditions for a single element.
 
 		Args:
-			elements ([WebElement]): array of elements to check
+			element (WebElement): the element to check
+			driver (WebDriver): optional driver to evaluate in a single script call
 
 		Returns:
-			[WebElement]: array of passing elements
+			bool: True if the element passes all conditions
 		"""
+		if driver is not None:
+			return len(self._evaluate_for_list([element], driver)) == 1
 		for condition in self.conditions:
 			if not condition(element):
 				return False
 		return True
 
-	def _evaluate_for_list(self, elements):
+	def _evaluate_for_list(self, elements, driver=None):
 		"""Evaluate the list of elements for all conditions, returning an array of all elements that pass all conditions.
 
+		If a driver is provided and all conditions can be evaluated in the
+		browser then every element is checked in a single script call rather
+		than a command per condition per element.
+
 		Args:
 			elements ([WebElement]): array of elements to check
+			driver (WebDriver): optional driver for batched evaluation
 
 		Returns:
 			[WebElement]: array of passing elements
 		"""
+		if len(elements) == 0 or len(self.conditions) == 0:
+			return list(elements)
+		if driver is not None:
+			passing = self._evaluate_in_browser(elements, driver)
+			if passing is not None:
+				return passing
 		passing = []
 		for element in elements:
 			element_passing = True
@@ -145,6 +199,28 @@ class EC():
 				passing.append(element)
 		return passing
 
+	def _evaluate_in_browser(self, elements, driver):
+		"""Evaluate all conditions for all elements in one script call.
+
+		Args:
+			elements ([WebElement]): array of elements to check
+			driver (WebDriver): the driver to run the script with
+
+		Returns:
+			[WebElement]: array of passing elements, or None if the conditions
+				can't be evaluated in the browser
+		"""
+		keys = self._script_keys()
+		if keys is None:
+			return None
+		try:
+			indexes = driver.execute_script(scripts.FILTER_CONDITIONS,
+				list(elements), keys)
+		except WebDriverException:
+			# e.g. a stale element, let the standard evaluation report it
+			return None
+		return [elements[i] for i in indexes]
+
 	@property
 	def description(self):
 		return "[{}]".format(" ".join(self._description))
@@ -152,22 +228,85 @@ class EC():
 ##################################################################################################################
 
 class Text():
-	"""Text match types.
+	"""Text match types and list item conditions.
+
+	Conditions carry a 'predicates' spec so lists can evaluate them for all
+	items in a single script call (see Text.matching), the lambda is used
+	where that isn't possible.
 	"""
 
 	EXACT = 1
 	SUBSTRING = 2
 	REGEX = 3
 
+	MATCH_NAMES = {EXACT: 'exact', SUBSTRING: 'substring', REGEX: 'regex'}
+
+	# Python regex syntax that JS rejects or reads differently (\A, \Z, named
+	# groups, inline flags, comments, conditionals and lookbehinds), such
+	# patterns are only evaluated in Python
+	PYTHON_ONLY_REGEX = re.compile(r'\\[AZ]|\(\?(?:P|#|\(|<[=!]|[aiLmsux]+[:)])')
+
 	@classmethod
 	def element_condition(cls, text, match):
-		condition = None
 		if match == cls.REGEX:
-			return lambda element: re.compile(text).match(element.text)
+			pattern = re.compile(text)
+			condition = lambda element: pattern.match(element.text)
+			if cls.PYTHON_ONLY_REGEX.search(text):
+				return condition
 		elif match == cls.SUBSTRING:
-			return lambda element: text in element.text
+			condition = lambda element: text in element.text
 		else:
-			return lambda element: text == element.text
+			match = cls.EXACT
+			condition = lambda element: text == element.text
+		condition.predicates = [('text', cls.MATCH_NAMES[match], text)]
+		return condition
+
+	@classmethod
+	def attribute_condition(cls, attribute, value):
+		condition = lambda element: value == element.get_attribute(attribute)
+		condition.predicates = [('attribute', attribute, value)]
+		return condition
+
+	@classmethod
+	def relative_condition(cls, element_condition, relative_xpath):
+		"""Extend a condition to also require an element matching a relative
+		xpath.
+		"""
+		def condition(element):
+			try:
+				return element_condition(element) and \
+					element.find_element(By.XPATH, relative_xpath) != None
+			except:
+				return False
+		predicates = getattr(element_condition, 'predicates', None)
+		if predicates is not None:
+			condition.predicates = predicates + [('relative', relative_xpath)]
+		return condition
+
+	@classmethod
+	def matching(cls, driver, elements, element_condition):
+		"""Get the elements matching a condition, in one script call if the
+		condition has a predicates spec.
+
+		Args:
+			driver (WebDriver): the driver to run the script with
+			elements ([WebElement]): the elements to check
+			element_condition (lambda): the condition
+
+		Returns:
+			[WebElement]: the matching elements
+		"""
+		predicates = getattr(element_condition, 'predicates', None)
+		if predicates is not None and elements:
+			try:
+				indexes = driver.execute_script(scripts.MATCH_ELEMENTS,
+					list(elements), predicates)
+			except WebDriverException:
+				# e.g. a stale element, let the standard evaluation report it
+				indexes = None
+			if indexes is not None:
+				return [elements[i] for i in indexes]
+		return [element for element in elements if element_condition(element)]
 
 ##################################################################################################################
 
@@ -175,6 +314,10 @@ class BaseElement(object):
 	"""	Core element represemtation shared by page, iframe, section and element.
 	"""
 
+	# set True to reuse the elements defined by the first setup() of the class
+	# (see LocatorTemplate), only where setup() doesn't depend on instance state
+	cache_setup = False
+
 	def __init__(self, driver, by=None, value=None, parent=None, name=None):
 		super(BaseElement, self).__init__()
 		self.driver = driver
@@ -183,11 +326,40 @@ class BaseElement(object):
 		self.parent = parent
 		self.name = name
 		self.conditions = EC()
-		self.setup()
+		self._web_element_state = None
+		# the element this was defined on, parent may change when selectors
+		# are combined
+		self._container = None
+		self._setup()
+
+	def __getattr__(self, attr):
+		# elements of template bound instances are built on first access
+		template = self.__dict__.get('_template')
+		if template and attr in template.definitions:
+			return template.build(self, attr)
+		raise AttributeError("'{}' object has no attribute '{}'".format(
+			type(self).__name__, attr))
+
+	def _setup(self):
+		"""Run setup() or bind to the class template if it has been captured.
+		"""
+		if not self.cache_setup:
+			self.setup()
+			return
+		template = LocatorTemplate.for_class(type(self))
+		if template and template.matches(self):
+			template.bind(self)
+		elif template is None:
+			existing = set(vars(self))
+			key = LocatorTemplate.instance_key(self)
+			self.setup()
+			LocatorTemplate.capture(self, existing, key)
+		else:
+			self.setup()
 
 	def combine_selectors(self):
 		"""Check parent to see if the selector can be combined with this
-		element to reduce queries
+		element to reduce queries (see SelectorCompiler).
 		"""
 
 		# bad circular reference but going with the quick solution for now
@@ -195,11 +367,54 @@ class BaseElement(object):
 
 		from automations.core.element import Iframe
 
-		if self.parent != None and self.parent.by == By.CSS_SELECTOR and \
-			self.by == By.CSS_SELECTOR and not isinstance(self.parent, Iframe):
-			self.value = self.parent.value + " " + self.value
+		if self._container is None:
+			self._container = self.parent
+		while self.parent != None and self.parent.by and self.by and \
+			not isinstance(self.parent, Iframe):
+			if self.parent.conditions._count() > 0:
+				# the parent's conditions must be checked on the parent
+				return
+			combined = SelectorCompiler.combine(self.parent.by,
+				self.parent.value, self.by, self.value)
+			if not combined:
+				SelectorCompiler.report(self.parent, self)
+				return
+			self.by, self.value = combined
 			self.parent = self.parent.parent
 
+	def _compile_children(self):
+		"""Flatten the selectors of elements defined below this one (e.g. in
+		setup() before this element's own selector was set).
+		"""
+		from automations.core.element import Iframe
+
+		pending = [self]
+		seen = set()
+		while pending:
+			node = pending.pop()
+			for attr, child in list(vars(node).items()):
+				if attr in ('parent', '_container') or \
+					not isinstance(child, BaseElement) or id(child) in seen:
+					continue
+				seen.add(id(child))
+				if isinstance(child, Iframe):
+					continue
+				if child.parent is self:
+					child.combine_selectors()
+				pending.append(child)
+
+	def _flatten(self):
+		"""Flatten the children of sections above this element, deferred
+		until the first lookup so that conditions chained on to the section
+		are known (see _section_by).
+		"""
+		node = self.parent
+		while node is not None:
+			if node.__dict__.get('_compile_pending'):
+				node._compile_pending = False
+				node._compile_children()
+			node = node.parent
+
 	def setup(self):
 		"""Override this method in page/section/iframe implementations and initialise elements here.
 		"""
@@ -239,7 +454,8 @@ class BaseElement(object):
 				description = (script_string[:50] + '..') if len(script_string) > 50 else script_string
 			Log.logger.info("{}execute_script: {}".format(self._log_prefix(), description))
 		try:
-			self.driver.switch_to.default_content()
+			DomObserver.for_driver(self.driver).touch()
+			FrameContext.for_driver(self.driver).default()
 			return self.driver.execute_script(script_string)
 		except:
 			if once_only or retry >= 5:
@@ -329,31 +545,65 @@ class BaseElement(object):
 			seconds (int): time in seconds to wait
 		"""
 		target = time.time() + seconds
-		self.wait_until(lambda _: target < time.time(), timeout=seconds + 2)
+		self.wait_until(lambda _: target < time.time(), timeout=seconds + 2,
+			event_driven=False)
 
-	def wait_until(self, condition, desc=None, tick=0.5, timeout=TIMEOUT):
+	def wait_until(self, condition, desc=None, tick=None, timeout=TIMEOUT,
+		event_driven=None, key=None):
 		"""Wait until a condition passes.
 
+		Without a fixed tick retries start fast and back off (see
+		PollScheduler), using any recorded history for the key to pick the
+		initial tick.
+
+		In event driven mode the condition is only rechecked once the page DOM
+		changes (or DomObserver.max_block passes) instead of every tick.
+
 		Args:
 			condition (lambda): the condition to verify
 			desc (str): description of the expectation
-			tick (float): interval between retries (seconds)
+			tick (float): fixed interval between retries (seconds), None for
+				adaptive ticks
 			timeout (int): maximum time to wait (seconds)
+			event_driven (bool): wait on DOM changes between retries, defaults
+				to EVENT_WAITS
+			key (str): optional key to record resolution time history against
 
 		Returns:
 			the result of the condition
 		"""
+		scheduler = PollScheduler(key)
+		next_tick = (lambda: tick) if tick is not None else scheduler.next_tick
+		if event_driven is None:
+			event_driven = EVENT_WAITS
+		observer = DomObserver.for_driver(self.driver) if event_driven else None
+		script_timeout = observer.allow_blocking() if observer else None
+
 		exc = None
 		# include buffer to allow at least 1 regular tick
 		end = time.time() + timeout + 0.9
-		while(time.time() <= end):
-			try:
-				result = condition(self)
-				if result != False:
-					return result
-			except Exception as iter_exc:
-				exc = iter_exc
-			time.sleep(tick)
+		try:
+			while(time.time() <= end):
+				try:
+					result = condition(self)
+					if result != False:
+						scheduler.resolved()
+						return result
+				except Exception as iter_exc:
+					exc = iter_exc
+				if observer:
+					start = time.time()
+					state = observer.await_change(end - start, next_tick())
+					if state is None:
+						time.sleep(next_tick())
+					elif time.time() - start < observer.settle:
+						# keep a minimum tick for pages that never settle
+						time.sleep(observer.settle)
+				else:
+					time.sleep(next_tick())
+		finally:
+			if observer:
+				observer.restore_script_timeout(script_timeout)
 		if exc:
 			raise exc
 		if desc:
@@ -420,9 +670,20 @@ class BaseElement(object):
 		Raises:
 			TimeoutException: if the element is not located
 		"""
-		self.wait_until(lambda _: self._find_now(), timeout=timeout)
+		# immediate checks (timeout=0) would only skew the history
+		key = self._poll_key() if timeout > 0 else None
+		self.wait_until(lambda _: self._find_now(), timeout=timeout, key=key)
 		return self
 
+	def _poll_key(self):
+		"""Key identifying this locator for wait history.
+
+		Returns:
+			str: the by, value and conditions of this element
+		"""
+		return "{}={} {}".format(self.by, self.value,
+			self.conditions.description)
+
 	def _find_parent_frame(self):
 		"""Locate the parent frame if there is one.
 
@@ -462,7 +723,7 @@ class BaseElement(object):
 					.format(self._log_prefix(), self.parent.description,
 						self.name))
 		else:
-			self.driver.switch_to.default_content()
+			FrameContext.for_driver(self.driver).default()
 			return None
 
 	def _name(self):
@@ -0,0 +1,152 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from automations.core import scripts
+from automations.core.frame_context import FrameContext
+
+# async script timeout assumed if the driver can't report it (W3C default)
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+
+class DomObserver(object):
+	"""Per-driver helper blocking on page DOM changes.
+
+	A MutationObserver (plus load/hashchange/popstate listeners) is installed
+	in the current document, counting changes as a generation. Waits block on
+	an async script until the generation moves on from the last state seen,
+	or the block times out.
+
+	States are strings of the form '{page token}:{generation}', each document
+	(page load or frame) has it's own observer with it's own token. The last
+	state seen by a wait is kept per frame.
+
+	States are also used to trust cached web elements: an element located in
+	a state that the page still reports (checked with one script) is still
+	valid.
+	"""
+
+	# maximum time a single async script blocks (seconds), conditions are
+	# always rechecked at least this often
+	max_block = 2.0
+
+	# time allowed for a burst of DOM changes to settle before waking (seconds)
+	settle = 0.05
+
+	def __init__(self, driver):
+		self.driver = driver
+		self.states = {}
+		self.touched = False
+
+	@classmethod
+	def for_driver(cls, driver):
+		"""Get the observer for a driver, creating it on first use.
+
+		Args:
+			driver (WebDriver): the driver
+
+		Returns:
+			DomObserver: the driver's observer
+		"""
+		observer = getattr(driver, '_dom_observer', None)
+		if observer is None:
+			observer = cls(driver)
+			setattr(driver, '_dom_observer', observer)
+		return observer
+
+	def await_change(self, timeout, first_block):
+		"""Block until the DOM of the current frame has changed since the last
+		state seen in it.
+
+		Changes made before a frame's observer is installed can't be seen, so
+		with no state seen in the frame the block is limited to first_block.
+
+		Args:
+			timeout (float): maximum time to block (seconds)
+			first_block (float): maximum time to block with no state seen
+
+		Returns:
+			str: the current state, None if it could not be observed (e.g. the
+				page unloaded while waiting)
+		"""
+		frame = self._frame_key()
+		since = self.states.get(frame) if frame is not None else None
+		if since is None:
+			timeout = min(timeout, first_block)
+		timeout = max(0, min(timeout, self.max_block))
+		try:
+			state = self.driver.execute_async_script(
+				scripts.AWAIT_DOM_CHANGE, since, int(timeout * 1000),
+				int(self.settle * 1000))
+		except WebDriverException:
+			# page unloaded mid-wait or async scripts unsupported
+			state = None
+		if frame is not None:
+			self.states[frame] = state
+		return state
+
+	def allow_blocking(self):
+		"""Set the driver's async script timeout to allow for a full block.
+
+		Returns:
+			float: the previous timeout (seconds), to pass to
+				restore_script_timeout
+		"""
+		try:
+			previous = self.driver.execute('getTimeouts')['value']['script'] \
+				/ 1000.0
+		except Exception:
+			# not a W3C session (or the command isn't known to the client)
+			previous = DEFAULT_SCRIPT_TIMEOUT
+		self.driver.set_script_timeout(self.max_block + 5)
+		return previous
+
+	def restore_script_timeout(self, previous):
+		"""Restore the script timeout replaced by allow_blocking.
+
+		Args:
+			previous (float): the timeout returned by allow_blocking
+		"""
+		try:
+			self.driver.set_script_timeout(previous)
+		except WebDriverException:
+			pass
+
+	def observed(self):
+		"""Record that elements have just been located with their state.
+		"""
+		self.touched = False
+
+	def touch(self):
+		"""Flag that the page has probably changed (e.g. an action or
+		navigation was performed) so cached elements are re-checked without
+		asking the page for it's state first.
+		"""
+		self.touched = True
+
+	def is_current(self, state):
+		"""Check if the DOM is still in a previously observed state.
+
+		Asks the page for the current frame's state, an element from another
+		frame or document never matches.
+
+		Args:
+			state (str): the state recorded when an element was located
+
+		Returns:
+			bool: True if nothing has changed since
+		"""
+		if state is None or self.touched:
+			return False
+		try:
+			return self.driver.execute_script(scripts.DOM_STATE) == state
+		except WebDriverException:
+			return False
+
+	def _frame_key(self):
+		"""Get the key of the current frame, None if unknown.
+		"""
+		context = FrameContext.for_driver(self.driver)
+		if not context.known:
+			return None
+		return context.frame.id if context.frame is not None else ''
@@ -14,10 +14,15 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 
-from automations.core.base_element import DEBUG, DEFAULT_ATTR_ID, TIMEOUT, BaseElement
-from automations.core.element_actions import ElementActionsMixin
+from automations.core import scripts
+from automations.core.base_element import DEBUG, DEFAULT_ATTR_ID, DOM_CACHE, TIMEOUT, BaseElement, debug
+from automations.core.dom_observer import DomObserver
+from automations.core.element_actions import ActionException, ElementActionsMixin
+from automations.core.frame_context import FrameContext
 from automations.core.list_element_absence import ElementsAbsenceMixin
 from automations.core.list_element_presence import ElementsPresenceMixin
+from automations.core.locator import Locator
+from automations.core.page_timing import PageTiming
 from automations.core.window import WindowMixin
 from automations.utils.log import Log
 
@@ -94,6 +99,69 @@ class Elements(ElementsPresenceMixin, ElementsAbsenceMixin, BaseElement):
 			pass
 		return temp
 
+	def texts(self):
+		"""Get the text of all currently matching elements in one call.
+
+		Returns:
+			[str]: the visible text of each element (as Element.text)
+		"""
+		return self._read('text')
+
+	def attributes(self, name):
+		"""Get an attribute of all currently matching elements in one call.
+
+		Args:
+			name (str): the attribute (or property) name
+
+		Returns:
+			[str]: the value for each element (as WebElement.get_attribute),
+				None where not present
+		"""
+		return self._read('attribute', name)
+
+	def properties(self, names):
+		"""Get DOM properties of all currently matching elements in one call.
+
+		Args:
+			names ([str]): the property names
+
+		Returns:
+			[dict]: property values by name for each element, None for
+				properties that are not strings, numbers or booleans
+		"""
+		return self._read('properties', list(names))
+
+	def rects(self):
+		"""Get the location and size of all currently matching elements in
+		one call.
+
+		Returns:
+			[dict]: the x, y (relative to the document), width and height of
+				each element
+		"""
+		return self._read('rect')
+
+	def _read(self, kind, arg=None):
+		"""Read a value from all currently matching elements with a single
+		script call.
+
+		Returns:
+			list: the values in list order, empty if no elements match
+		"""
+		try:
+			return self._read_now(kind, arg)
+		except StaleElementReferenceException:
+			# the list changed since it was located, find it again
+			return self._read_now(kind, arg)
+
+	def _read_now(self, kind, arg):
+		try:
+			self._find(0)
+		except (NoSuchElementException, TimeoutException):
+			return []
+		return self.driver.execute_script(scripts.READ_ELEMENTS,
+			self.web_elements, kind, arg)
+
 	def _find_now(self):
 		"""Attempt to find this element within it's validated parent hierarchy.
 
@@ -102,21 +170,26 @@ class Elements(ElementsPresenceMixin, ElementsAbsenceMixin, BaseElement):
 				elements are not found
 		"""
 		try:
-			root = self._find_root()
-			if not root or self.parent and isinstance(self.parent, Iframe):
-				# if no root or parent is iFrame search the whole page
-				self.web_elements = self.driver.find_elements(self.by,
-					self.value)
+			located = Locator.locate_for(self)
+			if located is not None:
+				# whole chain and conditions resolved in a single script call
+				self.web_elements = located
 			else:
-				# otherwise search the root/parent element
-				self.web_elements = root.find_elements(self.by, self.value)
-
-			# if conditions then verify
-			if self.conditions._count() > 0:
+				root = self._find_root()
+				if not root or self.parent and isinstance(self.parent, Iframe):
+					# if no root or parent is iFrame search the whole page
+					self.web_elements = self.driver.find_elements(self.by,
+						self.value)
+				else:
+					# otherwise search the root/parent element
+					self.web_elements = root.find_elements(self.by, self.value)
 
-				self.web_elements = self.conditions._evaluate_for_list(
-					self.web_elements)
+				# if conditions then verify
+				if self.conditions._count() > 0:
+					self.web_elements = self.conditions._evaluate_for_list(
+						self.web_elements, self.driver)
 
+			if self.conditions._count() > 0:
 				if len(self.web_elements) == 0:
 					self.web_elements = None
 					raise NoSuchElementException("{}Could not find any "
@@ -133,6 +206,8 @@ class Elements(ElementsPresenceMixin, ElementsAbsenceMixin, BaseElement):
 		except NoSuchElementException as nse:
 			raise
 		except:
+			# e.g. the frame we believed we were in has gone
+			FrameContext.for_driver(self.driver).reset()
 			raise NoSuchElementException("{}Could not find any element {} "
 				"satisfying conditions {}"
 				.format(self._log_prefix(), self.description,
@@ -505,6 +580,9 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 		section.value = value
 		section.name = name
 		section.combine_selectors()
+		# conditions chained after this (e.g. .visible()) must be set before
+		# children are flattened past the section, see _flatten
+		section._compile_pending = True
 		return section
 
 	################################
@@ -514,7 +592,7 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 	def switch_to_default(self):
 		"""Convenience method to switch to page context.
 		"""
-		self.driver.switch_to.default_content()
+		FrameContext.for_driver(self.driver).default()
 
 	def _find_now(self, indent=''):
 		"""Attempt to find this element within it's validated parent hierarchy.
@@ -528,8 +606,8 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 
 		try:
 			self.web_element = None
-			root = self._find_root(indent=indent + '  ')
-			elements = self._apply_conditions(self._find_web_elements(root))
+			self._web_element_state = None
+			elements = self._locate(indent=indent)
 
 			if len(elements) == 1:
 				self.web_element = elements[0]
@@ -549,6 +627,8 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 		except NoSuchElementException as nse:
 			raise
 		except:
+			# e.g. the frame we believed we were in has gone
+			FrameContext.for_driver(self.driver).reset()
 			raise NoSuchElementException("{}Could not find element {} "
 				"satisfying conditions {}".format(self._log_prefix(),
 					self.description, self.conditions.description))
@@ -557,12 +637,17 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 		"""Simple check of validity of any previously located Selenium element.
 
 		Verifies that the element is not stale and that is passes any defined
-		conditions.
+		conditions. With DOM_CACHE enabled an element located in the DOM state
+		the page still reports is reused without checking it's conditions.
 		"""
 		if self.web_element:
+			if DOM_CACHE and DomObserver.for_driver(self.driver).is_current(
+				self._web_element_state):
+				return True
 			try:
 				if self.conditions._count() > 0:
-					return self.conditions._evaluate_for(self.web_element)
+					return self.conditions._evaluate_for(self.web_element,
+						self.driver)
 				else:
 					self.web_element.is_displayed()
 					return True
@@ -570,6 +655,21 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 				return False
 		return False
 
+	def _locate(self, indent=''):
+		"""Find the web elements matching this element and it's conditions.
+
+		Resolves the whole parent chain in a single script call where
+		possible, otherwise locates each parent level in turn.
+
+		Returns:
+			[element]: list of located Selenium web elements passing conditions
+		"""
+		located = Locator.locate_for(self)
+		if located is not None:
+			return located
+		root = self._find_root(indent=indent + '  ')
+		return self._apply_conditions(self._find_web_elements(root))
+
 	def _find_web_elements(self, root):
 		"""Perform the Selenium query to find this element from it's root.
 
@@ -596,7 +696,7 @@ class Element(ElementActionsMixin, WindowMixin, BaseElement):
 			[element]: list of elements that pass specified conditions
 		"""
 		if self.by and len(elements) > 0:
-			return self.conditions._evaluate_for_list(elements)
+			return self.conditions._evaluate_for_list(elements, self.driver)
 		return elements
 
 ###############################################################################
@@ -621,17 +721,22 @@ class Page(Element):
 
 	def load_url(self, url):
 		"""Loads the given url and retries once on failure
+
+		The page timing is captured after the load (see PageTiming).
 		"""
 		print "i am here "
 		Log.logger.info("{}Loading URL: {}".format(self._log_prefix(), url))
 		self.url = url
+		DomObserver.for_driver(self.driver).touch()
 		try:
+			start = time()
 			self.driver.get(url)
 			print "2"
 		except:
 			# make one retry after short pause
 			try:
 				sleep(1)
+				start = time()
 				self.driver.get(url)
 			except Exception as ex:
 				# finally log and raise the last exception
@@ -639,6 +744,7 @@ class Page(Element):
 					self._log_prefix(), self.name, url)
 				Log.logger.info(msg)
 				raise Exception, msg, sys.exc_info()[2]
+		FrameContext.for_driver(self.driver).top_level()
 
 		# accept the alert if present
 		try:
@@ -647,10 +753,12 @@ class Page(Element):
 			print "3"
 			pass
 
+		PageTiming.capture(self.driver, url, time() - start)
+
 	def _find_now(self, indent=''):
 		"""Attempt to find this element within it's validated parent hierarchy.
 		"""
-		self.driver.switch_to.default_content()
+		FrameContext.for_driver(self.driver).default()
 		return True
 
 ###############################################################################
@@ -665,10 +773,16 @@ class Iframe(Element):
 
 	def _find_now(self, indent=''):
 		"""Attempt to find this element within it's validated parent hierarchy.
+
+		If the driver is already in this frame no switching or lookups are
+		made, child lookups reset the frame context if the frame has gone.
 		"""
-		self.driver.switch_to.default_content()
+		context = FrameContext.for_driver(self.driver)
+		if context.is_in(self.web_element):
+			return True
+		context.default()
 		if super(Iframe, self)._find_now():
-			self.driver.switch_to.frame(self.web_element)
+			context.enter(self.web_element)
 			return True
 		return False
 
@@ -680,3 +794,87 @@ class Section(Element):
 
 	def __init__(self, driver):
 		super(Section, self).__init__(driver)
+
+	def fill(self, fields, submit=None, ignore_fail=False, timeout=TIMEOUT,
+		fast=None):
+		"""Set many fields and optionally click submit.
+
+		In fast mode (see set_text) the fields are located and set with a
+		single script where possible (see Locator), any that can't be (or
+		that need key events) are set individually with set_text/set_checkbox.
+		Submit is clicked as a normal click, only if every field was set (or
+		ignore_fail).
+
+		Args:
+			fields (dict|[(Element, value)]): values by field element, text for
+				inputs and bool for checkboxes/radios, use pairs to set the
+				fields in order
+			submit (Element): optional element to click once filled
+			ignore_fail (bool): don't raise if any field fails
+			timeout (int): max time to wait for this section and any field
+				set individually
+			fast (bool): use fast mode, defaults to each field's fast_set_text
+
+		Returns:
+			{Element: str}: the error for each field, None if it was set
+
+		Raises:
+			ActionException: if any field could not be set
+		"""
+		fields = fields.items() if isinstance(fields, dict) else list(fields)
+		self._flush_batch()
+		self.verify(timeout=timeout)
+		Log.logger.info(u"{}Fill fields [{}] on [{}]".format(self._log_prefix(),
+			", ".join(element._name() for element, _ in fields), self._name()))
+
+		results = {}
+		scripted = []
+		locators = []
+		for element, value in fields:
+			field_fast = element.fast_set_text if fast is None else fast
+			locator = None
+			if field_fast and not element.needs_key_events:
+				locator = Locator.for_element(element)
+			if locator and (not locators or
+				locator.boundary is locators[0].boundary):
+				scripted.append((element, value))
+				locators.append(locator)
+
+		if scripted:
+			try:
+				root = locators[0].enter_boundary()
+				DomObserver.for_driver(self.driver).touch()
+				result = self.driver.execute_script(scripts.FILL_FIELDS, root,
+					[{'levels': locator.script_levels(), 'value': value}
+						for locator, (_, value) in zip(locators, scripted)])
+			except WebDriverException as ex:
+				debug("Fill script failed on {}: {}".format(self.description, ex))
+				result = None
+			if result:
+				for (element, _), status, web_element in zip(scripted,
+					result['statuses'], result['elements']):
+					if status == 'set':
+						results[element] = None
+						element.web_element = web_element
+						element._web_element_state = None
+
+		for element, value in fields:
+			if element in results:
+				continue
+			try:
+				if isinstance(value, bool):
+					element.set_checkbox(value, timeout=timeout)
+				else:
+					element.set_text(value, timeout=timeout, fast=fast)
+				results[element] = None
+			except Exception as ex:
+				results[element] = u"{}".format(ex)
+
+		failed = [element for element, _ in fields if results[element]]
+		if failed and not ignore_fail:
+			raise ActionException(u"{}Failed to fill fields on [{}]: {}".format(
+				self._log_prefix(), self._name(), "; ".join(u"{} ({})".format(
+					element.description, results[element]) for element in failed)))
+		if submit:
+			submit.click(timeout=timeout)
+		return results
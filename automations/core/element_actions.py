@@ -1,7 +1,16 @@
+import sys
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 
-from automations.core.base_element import TIMEOUT
+from automations.core import scripts
+from automations.core.base_element import TIMEOUT, debug
+from automations.core.dom_observer import DomObserver
 from automations.core.element_state import ElementStateMixin
+from automations.core.retry import RetryPolicy, RetryStats
 from automations.utils.log import Log
 
 
@@ -15,34 +24,87 @@ class ElementActionsMixin(ElementStateMixin):
 	"""
 
 	click_fail_js = []
+	_click_fail_script = None
+	_click_fail_stats = {}
+	_click_fail_lock = threading.Lock()
+
+	# set text with a single script rather than keystrokes (opt in globally,
+	# per class or per call), fields marked key_events() always use keystrokes
+	fast_set_text = False
+	needs_key_events = False
+
+	# RetryPolicy for actions on this element and it's children, None to use
+	# the parent's (or RetryPolicy.default)
+	retry_policy = None
 
 	def setup(self):
 		pass
 
-	def click(self, timeout=TIMEOUT):
+	def key_events(self):
+		"""Mark this field as needing genuine key events when setting text
+		(e.g. key handlers that format or autocomplete the value).
+
+		Returns:
+			Element: this element for chaining
+		"""
+		self.needs_key_events = True
+		return self
+
+	def batch(self):
+		"""Collect clicks, key presses, moves and drags made within the
+		context and perform them together as one action chain on exit.
+
+		Usage:
+			with section.batch():
+				...
+
+		Returns:
+			ActionBatch: the batch context
+		"""
+		from automations.core.action_batch import ActionBatch
+		return ActionBatch(self.driver)
+
+	def click(self, timeout=TIMEOUT, retry=None):
 		"""Click this element.
 
-		First verifies element state and will perform one click retry on error.
+		First verifies element state and will retry on error (see RetryPolicy).
+		Queued if within a batch().
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
 		"""
+		if self._batched('click', timeout=timeout, retry=retry):
+			return
 		self.verify(timeout=timeout)
 		Log.logger.info("{}Click: [{}]".format(self._log_prefix(),
 			self._name()))
-		self._perform_action(lambda _: self.web_element.click())
+		self._perform_action(lambda _: self.web_element.click(),
+			name='click', retry=retry)
 
-	def clear(self, timeout=TIMEOUT):
+	def clear(self, timeout=TIMEOUT, retry=None):
 		"""Clear this element (text input).
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
 		"""
+		self._flush_batch()
 		self.verify(timeout=timeout)
 		Log.logger.info("{}Clear field: [{}]".format(self._log_prefix(),
 			self._name()))
-		self._perform_action(lambda _: self.web_element.clear())
+		self._perform_action(lambda _: self.web_element.clear(),
+			name='clear', retry=retry)
 
-	def send_keys(self, *value):
+	def send_keys(self, *value, **kwargs):
 		"""Send keys to this web element.
 
+		Queued if within a batch().
+
 		Args:
 			value (str): string to be sent
+			retry (RetryPolicy): optional policy for this call (keyword only)
 		"""
+		if self._batched('send_keys', *value, retry=kwargs.get('retry')):
+			return
 		self.verify()
 		valString = None
 		for val in value:
@@ -53,27 +115,78 @@ class ElementActionsMixin(ElementStateMixin):
 
 		Log.logger.info(u"{}Send keys '{}' to [{}]".format(self._log_prefix(),
 			valString, self._name()))
-		self._perform_action(lambda _: self.web_element.send_keys(value))
+		self._perform_action(lambda _: self.web_element.send_keys(value),
+			name='send_keys', retry=kwargs.get('retry'))
 
 	def page_bottom(self):
 		"""Scrolling to the bottom of element (container) height.
 		"""
+		self._flush_batch()
 		scrollable = self.verify().web_element
+		DomObserver.for_driver(self.driver).touch()
 		self.driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", scrollable)
 
-	def page_down(self):
+	def page_down(self, retry=None):
 		"""Send a page down keyboard event to the element.
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
 		"""
+		if self._batched('send_keys', Keys.PAGE_DOWN, retry=retry):
+			return
 		self._perform_action(
-			lambda _: self.web_element.send_keys(Keys.PAGE_DOWN))
+			lambda _: self.web_element.send_keys(Keys.PAGE_DOWN),
+			name='page_down', retry=retry)
 
-	def page_up(self):
+	def page_up(self, retry=None):
 		"""Send a page up keyboard event to the element.
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
 		"""
+		if self._batched('send_keys', Keys.PAGE_UP, retry=retry):
+			return
 		self._perform_action(
-			lambda _: self.web_element.send_keys(Keys.PAGE_UP))
+			lambda _: self.web_element.send_keys(Keys.PAGE_UP),
+			name='page_up', retry=retry)
+
+	def move_to(self, timeout=TIMEOUT, retry=None):
+		"""Move the mouse to the middle of this element (e.g. hover).
 
-	def set_text_and_return(self, text, timeout=TIMEOUT):
+		Queued if within a batch().
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
+		"""
+		if self._batched('move_to', timeout=timeout, retry=retry):
+			return
+		self.verify(timeout=timeout)
+		Log.logger.info("{}Move to: [{}]".format(self._log_prefix(),
+			self._name()))
+		self._perform_action(lambda _: ActionChains(self.driver)
+			.move_to_element(self.web_element).perform(), name='move_to',
+			retry=retry)
+
+	def drag_to(self, target, timeout=TIMEOUT, retry=None):
+		"""Drag this element and drop it on another.
+
+		Queued if within a batch().
+
+		Args:
+			target (Element): the element to drop on
+			retry (RetryPolicy): optional policy for this call
+		"""
+		if self._batched('drag_to', target, timeout=timeout, retry=retry):
+			return
+		self.verify(timeout=timeout)
+		target.verify(timeout=timeout)
+		Log.logger.info("{}Drag [{}] to [{}]".format(self._log_prefix(),
+			self._name(), target._name()))
+		self._perform_action(lambda _: ActionChains(self.driver)
+			.drag_and_drop(self.web_element, target.web_element).perform(),
+			name='drag_to', retry=retry)
+
+	def set_text_and_return(self, text, timeout=TIMEOUT, retry=None):
 		"""Replace text in an input field by selecting it all then replacing.
 
 		Performs 3 attempts at setting the text, verifying that the field ends
@@ -82,73 +195,172 @@ class ElementActionsMixin(ElementStateMixin):
 
 		Args:
 			text (str): the text to set
+			retry (RetryPolicy): optional policy for each keystroke action
 		"""
-		self.set_text(text, timeout=timeout)
-		self._perform_action(lambda _: self.web_element.send_keys(Keys.RETURN))
+		self.set_text(text, timeout=timeout, retry=retry)
+		self._perform_action(lambda _: self.web_element.send_keys(Keys.RETURN),
+			name='send_keys', retry=retry)
 
-	def set_text(self, text, timeout=TIMEOUT):
+	def set_text(self, text, timeout=TIMEOUT, fast=None, retry=None):
 		"""Replace text in an input field by selecting it all then replacing.
 
 		Performs 3 attempts at setting the text, verifying that the field ends
 		up with the correct result.
 
+		In fast mode the value is set and verified with a single script,
+		falling back to keystrokes if that fails or the field needs key events.
+
 		Args:
 			text (str): the text to set
+			fast (bool): use fast mode, defaults to fast_set_text
+			retry (RetryPolicy): optional policy for each keystroke action
 		"""
+		self._flush_batch()
 		self.verify(timeout=timeout)
 		Log.logger.info(u"{}Set text '{}' on [{}]".format(
 			self._log_prefix(), text, self._name()))
 
+		if fast is None:
+			fast = self.fast_set_text
+		if fast and not self.needs_key_events and self._set_text_by_script(text):
+			return
+
 		count = 0
 		while count < 3 and \
 			not (self.web_element.get_attribute("value") == text):
 
 			if self._windows_env():
 				self._perform_action(
-					lambda _: self.web_element.send_keys(Keys.HOME))
+					lambda _: self.web_element.send_keys(Keys.HOME),
+					name='set_text', retry=retry)
 				self._perform_action(
-					lambda _: self.web_element.send_keys(Keys.CONTROL, 'a'))
+					lambda _: self.web_element.send_keys(Keys.CONTROL, 'a'),
+					name='set_text', retry=retry)
 			else:
 				self._perform_action(
-					lambda _: self.web_element.send_keys(Keys.HOME))
+					lambda _: self.web_element.send_keys(Keys.HOME),
+					name='set_text', retry=retry)
 				self._perform_action(
-					lambda _: self.web_element.send_keys(Keys.SHIFT, Keys.END))
+					lambda _: self.web_element.send_keys(Keys.SHIFT, Keys.END),
+					name='set_text', retry=retry)
 
-			self._perform_action(lambda _: self.web_element.send_keys(text))
+			self._perform_action(lambda _: self.web_element.send_keys(text),
+				name='set_text', retry=retry)
 			count += 1
 
 		if self.web_element.get_attribute("value") != text:
 			raise Exception("Failed to set field text")
 
-	def set_checkbox(self, is_checked, ignore_fail=False, timeout=TIMEOUT):
+	def _batched(self, name, *args, **kwargs):
+		"""Queue an action if a batch() is active for this driver.
+
+		Returns:
+			bool: True if the action was queued
+		"""
+		from automations.core.action_batch import ActionBatch
+		batch = ActionBatch.active(self.driver)
+		if batch is None:
+			return False
+		batch.add(name, self, *args, **kwargs)
+		return True
+
+	def _flush_batch(self):
+		"""Perform any actions queued by an active batch() before an action
+		that can't be batched, keeping the order they were made in.
+		"""
+		from automations.core.action_batch import ActionBatch
+		ActionBatch.flush_active(self.driver)
+
+	def _set_text_by_script(self, text):
+		"""Set the field value with the native value setter and input/change
+		events, verifying the value in the same call.
+
+		Returns:
+			bool: True if the value was set
+		"""
+		DomObserver.for_driver(self.driver).touch()
+		try:
+			result = self.driver.execute_script(scripts.SET_VALUE,
+				self.web_element, text)
+		except WebDriverException as ex:
+			result = False
+			debug("Script set text failed on {}: {}".format(
+				self.description, ex))
+		return result is True
+
+	def set_checkbox(self, is_checked, ignore_fail=False, timeout=TIMEOUT,
+		retry=None):
 		"""If the checkbox is not at the desired value, toggle it.
 
 		Args:
 			is_checked (bool): desired checkbox state
+			retry (RetryPolicy): optional policy for the click
 		"""
+		self._flush_batch()
 		if self.is_selected(timeout=timeout) != is_checked:
-			self.click()
+			self.click(timeout=timeout, retry=retry)
+			# the state is checked below, don't leave the click queued
+			self._flush_batch()
 		if not ignore_fail:
 			if self.is_selected(timeout=timeout) != is_checked:
 				raise ActionException(u"Checkbox set on {} failed"
 					.format(self.description))
 
-	def submit(self, timeout=TIMEOUT):
+	def submit(self, timeout=TIMEOUT, retry=None):
 		"""Submit this element.
+
+		Args:
+			retry (RetryPolicy): optional policy for this call
 		"""
+		self._flush_batch()
 		self.verify(timeout=timeout)
-		self._perform_action(lambda _: self.web_element.submit())
+		self._perform_action(lambda _: self.web_element.submit(),
+			name='submit', retry=retry)
 
 	@classmethod
 	def register_click_fail_js(cls, fail_js):
 		"""Register JS actions to try clearing modals or debug windows if a
 		click fails.
 
+		All snippets are run with a single script, each guarded so a failure
+		does not prevent the rest from running.
+
 		Args:
 			fail_js (itr): iterable of JS invocation strings to directly clear
 				any debug/modals
 		"""
 		cls.click_fail_js.extend(fail_js)
+		ElementActionsMixin._click_fail_script = None
+
+	@classmethod
+	def click_fail_js_stats(cls):
+		"""Get how often each registered snippet has run, failed and actually
+		removed something from the page.
+
+		Returns:
+			{str: dict}: runs, errors and removed counts by snippet
+		"""
+		with ElementActionsMixin._click_fail_lock:
+			return dict((js, dict(stats)) for js, stats in
+				ElementActionsMixin._click_fail_stats.items())
+
+	@classmethod
+	def _compiled_click_fail_js(cls):
+		"""Get the combined script for all registered snippets.
+
+		Each snippet is wrapped in a function and try/catch, the result has an
+		entry per snippet with the number of DOM nodes removed or the error.
+		"""
+		if ElementActionsMixin._click_fail_script is None:
+			parts = ["var results = [], before;",
+				"var count = function() { return document.getElementsByTagName('*').length; };"]
+			for js in cls.click_fail_js:
+				parts.append("before = count();\n"
+					"try {{ (function() {{\n{}\n}})(); results.push({{removed: before - count()}}); }}\n"
+					"catch (e) {{ results.push({{error: String(e)}}); }}".format(js))
+			parts.append("return results;")
+			ElementActionsMixin._click_fail_script = "\n".join(parts)
+		return ElementActionsMixin._click_fail_script
 
 	def _run_click_fail_js(self):
 		"""Run any registered click fail JS executions
@@ -158,32 +370,74 @@ class ElementActionsMixin(ElementStateMixin):
 			# always run from page level
 			if parent_frame:
 				self.switch_to_default()
-			for js in self.click_fail_js:
-				try:
-					self.driver.execute_script(js)
-				except:
-					pass
+			snippets = list(self.click_fail_js)
+			try:
+				results = self.driver.execute_script(
+					self._compiled_click_fail_js())
+			except Exception:
+				# e.g. a snippet with a syntax error, run them one at a time
+				results = [self._run_click_fail_snippet(js) for js in snippets]
+			for js, result in zip(snippets, results or []):
+				# drivers run concurrently
+				with ElementActionsMixin._click_fail_lock:
+					stats = ElementActionsMixin._click_fail_stats.setdefault(js,
+						{'runs': 0, 'errors': 0, 'removed': 0})
+					stats['runs'] += 1
+					if 'error' in result:
+						stats['errors'] += 1
+					elif result.get('removed', 0) > 0:
+						stats['removed'] += 1
+				if 'error' not in result and result.get('removed', 0) > 0:
+					Log.logger.info(u"{}Click fail JS removed {} nodes: {}".format(
+						self._log_prefix(), result['removed'], js))
 			if parent_frame:
 				# re-locate the element (becomes stale after switching)
 				self._find_now()
 
-	def _perform_action(self, action, alt_action=None):
-		"""Generic action handler that makes 3 attempts to perform the action
-		1 second apart before failing.
+	def _run_click_fail_snippet(self, js):
+		"""Run a single click fail snippet.
+
+		Returns:
+			dict: the error if the snippet failed
+		"""
+		try:
+			self.driver.execute_script(js)
+			return {}
+		except Exception as ex:
+			return {'error': u"{}".format(ex)}
+
+	def _perform_action(self, action, alt_action=None, name=None, retry=None):
+		"""Generic action handler that retries the action according to the
+		RetryPolicy (by default 3 attempts 1 second apart) before failing.
+
+		Retries are counted per element in RetryStats.
 
 		Args:
 			action (lambda): a lambda for the action
+			name (str): the action name for policy overrides and stats
+			retry (RetryPolicy): optional policy for this call
 		"""
-		for i in range(3):
+		policy = RetryPolicy.resolve(self, name, retry)
+		backoff = policy.backoff()
+		start = time.time()
+		for attempt in range(1, policy.attempts + 1):
 			try:
+				# any action may change the page
+				DomObserver.for_driver(self.driver).touch()
 				action(self)
+				RetryStats.record(self, name, attempt - 1, time.time() - start)
 				return
-			except:
-				if i == 0:
-					# attempt to clear any known blocking elements
-					self._run_click_fail_js()
-					self.verify(timeout=0)
-				if i == 2:
+			except Exception as ex:
+				exc_info = sys.exc_info()
+				# never trust the cached element after a failure
+				self._web_element_state = None
+				if not policy.retryable(ex):
+					RetryStats.record(self, name, attempt - 1,
+						time.time() - start, failed=True)
+					raise exc_info[0], exc_info[1], exc_info[2]
+				if attempt == policy.attempts:
+					RetryStats.record(self, name, attempt - 1,
+						time.time() - start, failed=True)
 					# check obvious failures first, then throw the exception
 					assert self.web_element, \
 						'{} >> Element {} is not currently present'.format(
@@ -194,5 +448,9 @@ class ElementActionsMixin(ElementStateMixin):
 					assert self.web_element.is_enabled(), \
 						'{} >> Element {} is not currently enabled'.format(
 							self._log_prefix(), self.description)
-					raise
-				self.wait(1)
+					raise exc_info[0], exc_info[1], exc_info[2]
+				if attempt == 1:
+					# attempt to clear any known blocking elements
+					self._run_click_fail_js()
+					self.verify(timeout=0)
+				backoff.sleep()
@@ -0,0 +1,75 @@
+class FrameContext(object):
+	"""Per-driver record of the current frame context.
+
+	All frame switches made by the element layer go through the driver's
+	FrameContext so that switches to the context the driver is already in are
+	skipped. The context becomes unknown (the next switch is always made) if a
+	lookup fails unexpectedly or a tab is closed.
+	"""
+
+	def __init__(self, driver):
+		self.driver = driver
+		self.frame = None
+		self.known = False
+
+	@classmethod
+	def for_driver(cls, driver):
+		"""Get the frame context for a driver, creating it on first use.
+
+		Args:
+			driver (WebDriver): the driver
+
+		Returns:
+			FrameContext: the driver's frame context
+		"""
+		context = getattr(driver, '_frame_context', None)
+		if context is None:
+			context = cls(driver)
+			setattr(driver, '_frame_context', context)
+		return context
+
+	def default(self):
+		"""Switch to the page (default) content unless already there.
+		"""
+		if self.known and self.frame is None:
+			return
+		self.driver.switch_to.default_content()
+		self.top_level()
+
+	def enter(self, frame):
+		"""Switch into a frame unless already in it.
+
+		The driver must currently be in the context containing the frame.
+
+		Args:
+			frame (WebElement): the iframe element
+		"""
+		if self.is_in(frame):
+			return
+		self.driver.switch_to.frame(frame)
+		self.frame = frame
+		self.known = True
+
+	def is_in(self, frame):
+		"""Check if the driver is known to be in a frame.
+
+		Args:
+			frame (WebElement): the iframe element
+
+		Returns:
+			bool: True if the driver is in the frame
+		"""
+		return self.known and frame is not None and self.frame == frame
+
+	def top_level(self):
+		"""Record that the driver is at the top level of a window (e.g. after
+		a window switch or page load).
+		"""
+		self.frame = None
+		self.known = True
+
+	def reset(self):
+		"""Record that the current context is unknown.
+		"""
+		self.frame = None
+		self.known = False
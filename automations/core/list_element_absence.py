@@ -1,8 +1,6 @@
-import re
-
 from selenium.common.exceptions import TimeoutException
 
-from automations.core.base_element import TIMEOUT, debug
+from automations.core.base_element import TIMEOUT, Text, debug
 
 
 class ElementsAbsenceMixin(object):
@@ -20,7 +18,7 @@ class ElementsAbsenceMixin(object):
 			value (str): the value that must be absent
 			timeout (int): max time to wait
 		"""
-		self._no_element_for(lambda element: value == element.get_attribute(attribute), timeout,
+		self._no_element_for(Text.attribute_condition(attribute, value), timeout,
 			u"has value [{}] for attribute [{}]".format(attribute, value))
 
 	def no_element_with_text(self, text, timeout=TIMEOUT):
@@ -30,7 +28,7 @@ class ElementsAbsenceMixin(object):
 			text (str): the text that must be absent
 			timeout (int): max time to wait
 		"""
-		self._no_element_for(lambda element: text == element.text, timeout,
+		self._no_element_for(Text.element_condition(text, Text.EXACT), timeout,
 			u"has text [{}]".format(text))
 
 	def no_element_with_text_containing(self, text, timeout=TIMEOUT):
@@ -40,7 +38,7 @@ class ElementsAbsenceMixin(object):
 			text (str): the substring to be matched as absent
 			timeout (int): max time to wait
 		"""
-		self._no_element_for(lambda element: text in element.text, timeout,
+		self._no_element_for(Text.element_condition(text, Text.SUBSTRING), timeout,
 			u"has text containing [{}]".format(text))
 
 	def no_element_with_text_matching(self, regex, timeout=TIMEOUT):
@@ -50,7 +48,7 @@ class ElementsAbsenceMixin(object):
 			regex (str): regex for the element text that must be absent
 			timeout (int): max time to wait
 		"""
-		self._no_element_for(lambda element: re.compile(regex).match(element.text), timeout,
+		self._no_element_for(Text.element_condition(regex, Text.REGEX), timeout,
 			u"has text matching [{}]".format(regex))
 
 	def _no_element_for(self, element_condition, timeout, description):
@@ -81,9 +79,6 @@ class ElementsAbsenceMixin(object):
 		"""
 		try:
 			self._find_now()
-			for element in self.web_elements:
-				if element_condition(element):
-					return False
-			return True
+			return not Text.matching(self.driver, self.web_elements, element_condition)
 		except:
 			return True
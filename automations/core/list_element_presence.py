@@ -1,7 +1,4 @@
-import re
-
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
 
 from automations.core.base_element import TIMEOUT, Text, debug
 
@@ -25,7 +22,7 @@ class ElementsPresenceMixin(object):
 			value (str): the value that must be present
 			timeout (int): max time to wait
 		"""
-		return self._elements_for(lambda element: value == element.get_attribute(attribute), timeout,
+		return self._elements_for(Text.attribute_condition(attribute, value), timeout,
 			u"has value [{}] for attribute [{}]".format(attribute, value))[0]
 
 	################################
@@ -106,9 +103,10 @@ class ElementsPresenceMixin(object):
 		Args:
 			attribute (str): the attribute name
 			value (str): the value that must be present
+			relative_xpath (str): relative xpath to another element that must exist
 			timeout (int): max time to wait
 		"""
-		return self._elements_for(lambda element: value == element.get_attribute(attribute), timeout,
+		return self._elements_with_condition_and_relative(Text.attribute_condition(attribute, value), relative_xpath, timeout,
 			u"has value [{}] for attribute [{}] relative [{}]".format(attribute, value, relative_xpath))[0]
 
 	def element_with_text_and_relative(self, text, relative_xpath, timeout=TIMEOUT):
@@ -189,12 +187,8 @@ class ElementsPresenceMixin(object):
 			timeout (int): max time to wait
 			multiple (bool): defaults to false which requires that only one element matches, if true one or more elements may match
 		"""
-		def find_it(element):
-			try:
-				return element_condition(element) and element.find_element(By.XPATH, relative_xpath) != None
-			except:
-				return False
-		return self._elements_for(find_it, timeout, description, multiple=multiple)
+		return self._elements_for(Text.relative_condition(element_condition, relative_xpath),
+			timeout, description, multiple=multiple)
 
 	def _find_in_list(self, element_condition, results, multiple=False):
 		"""Check that an element exists in this list matching the provided condition at this time.
@@ -207,13 +201,10 @@ class ElementsPresenceMixin(object):
 		Returns:
 			bool: True if there are no matching element(s)
 		"""
-		found = 0
 		del results[:]
 		if self._find_now():
-			for element in self.web_elements:
-				if element_condition(element):
-					results.append(element)
-					found += 1
+			results.extend(Text.matching(self.driver, self.web_elements, element_condition))
+		found = len(results)
 		if found == 1 or (found > 1 and multiple):
 			return True
 		else:
@@ -0,0 +1,165 @@
+from selenium.common.exceptions import JavascriptException, \
+	NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from automations.core import scripts
+from automations.core.base_element import DOM_CACHE, debug
+from automations.core.dom_observer import DomObserver
+from automations.core.frame_context import FrameContext
+
+
+class Locator(object):
+	"""Locates an element and it's whole parent chain with a single
+	execute_script call.
+
+	The chain is walked up to the nearest page, iframe or detached list
+	element. Chains containing a level that can't be resolved in the browser
+	(unsupported BY or Python-only conditions) return None so the caller can
+	fall back to the standard per-level lookup.
+	"""
+
+	enabled = True
+
+	SUPPORTED_BY = (By.CSS_SELECTOR, By.XPATH, By.CLASS_NAME, By.TAG_NAME,
+		By.ID, By.NAME)
+
+	def __init__(self, element, levels, boundary):
+		"""New locator.
+
+		Args:
+			element (BaseElement): the element being located
+			levels ([BaseElement]): the chain from the top-most resolvable
+				ancestor down to the element
+			boundary (BaseElement): the page, iframe or detached list element
+				the chain is resolved from, None for the default content
+		"""
+		self.element = element
+		self.levels = levels
+		self.boundary = boundary
+
+	@classmethod
+	def for_element(cls, element):
+		"""Create a locator for the element if it's chain can be resolved in
+		the browser.
+
+		Args:
+			element (BaseElement): the element to be located
+
+		Returns:
+			Locator: the locator, or None if the standard lookup must be used
+		"""
+		# every lookup starts here, flatten any deferred section children
+		element._flatten()
+		if not cls.enabled or getattr(element, '_locator_unsupported', False):
+			return None
+
+		from automations.core.element import Iframe, Page
+
+		levels = []
+		node = element
+		while True:
+			if node.by not in cls.SUPPORTED_BY or \
+				node.conditions._script_keys() is None:
+				return None
+			levels.insert(0, node)
+			parent = node.parent
+			if parent is None or isinstance(parent, (Page, Iframe)):
+				return cls(element, levels, parent)
+			if parent.by is None and parent.value is None:
+				# detached list element, resolve from it's web element
+				if not getattr(parent, 'web_element', None):
+					return None
+				return cls(element, levels, parent)
+			node = parent
+
+	@classmethod
+	def locate_for(cls, element):
+		"""Convenience wrapper to locate an element if possible.
+
+		Args:
+			element (BaseElement): the element to be located
+
+		Returns:
+			[WebElement]: the matches, or None if the standard lookup must be
+				used
+		"""
+		locator = cls.for_element(element)
+		if locator:
+			return locator.locate()
+		return None
+
+	def locate(self):
+		"""Resolve the chain in the browser.
+
+		Returns:
+			[WebElement]: the final level matches passing all of it's
+				conditions, or None if the browser could not resolve the chain
+
+		Raises:
+			NoSuchElementException: if any parent level is not located
+		"""
+		root = self.enter_boundary()
+		try:
+			result = self.element.driver.execute_script(scripts.LOCATE_CHAIN,
+				root, self.script_levels(), DOM_CACHE)
+		except JavascriptException as ex:
+			# invalid selector or no script support, leave it to the standard
+			# lookup to report, other errors (e.g. a stale root) would fail it
+			# as well so are raised as is
+			debug("Locator fallback for {}: {}".format(
+				self.element.description, ex))
+			return None
+
+		if not result or result.get('status') == 'unsupported':
+			self.element._locator_unsupported = True
+			return None
+
+		if result['status'] == 'missing':
+			parent = self.levels[result['level']]
+			raise NoSuchElementException("{}Could not locate parent: {} "
+				"(level {}, {} matches) for element: [{}]".format(
+					self.element._log_prefix(), parent.description,
+					result['level'], result['count'], self.element.name))
+
+		state = result.get('state')
+		if state:
+			DomObserver.for_driver(self.element.driver).observed()
+		self.element._web_element_state = state
+		for node, web_element in zip(self.levels[:-1], result['parents']):
+			node.web_element = web_element
+			node._web_element_state = state
+		return result['matches']
+
+	def script_levels(self):
+		"""Get the chain as passed to the locate scripts.
+
+		Returns:
+			[dict]: the by, value and condition keys of each level
+		"""
+		return [{
+			'by': node.by,
+			'value': node.value,
+			'conditions': node.conditions._script_keys()
+		} for node in self.levels]
+
+	def enter_boundary(self):
+		"""Switch to the context the chain is resolved in.
+
+		Returns:
+			WebElement: the root web element or None to search the document
+		"""
+		from automations.core.element import Iframe, Page
+
+		boundary = self.boundary
+		if boundary is None:
+			FrameContext.for_driver(self.element.driver).default()
+			return None
+		if not isinstance(boundary, (Page, Iframe)):
+			return boundary.web_element
+		try:
+			boundary._find_now()
+			return None
+		except:
+			raise NoSuchElementException("{}Could not locate parent: {} for "
+				"element: [{}]".format(self.element._log_prefix(),
+					boundary.description, self.element.name))
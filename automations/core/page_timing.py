@@ -0,0 +1,91 @@
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from automations.core import scripts
+from automations.utils.log import Log
+
+"""Capture page load timing on Page.load_url, disable with env var PAGE_TIMING=0
+"""
+PAGE_TIMING = bool(int(os.environ.get('PAGE_TIMING', 1)))
+
+
+class PageTiming(object):
+	"""Per-load page timing held on the driver until collected (by
+	DriverSupport at cleanup).
+
+	Navigation timing (TTFB, DOMContentLoaded, load event, transfer sizes) and
+	a resource summary come from the performance timeline in every browser.
+	Chrome additionally records the DevTools Performance.getMetrics counters.
+	"""
+
+	@classmethod
+	def capture(cls, driver, url, elapsed):
+		"""Capture the timing of the page just loaded.
+
+		Args:
+			driver (WebDriver): the driver
+			url (str): the URL requested
+			elapsed (float): time taken by the load command (seconds)
+
+		Returns:
+			dict: the timing record, None if disabled
+		"""
+		if not PAGE_TIMING:
+			return None
+		record = {'url': url, 'elapsed': round(elapsed, 3)}
+		try:
+			record['navigation'] = driver.execute_script(
+				scripts.NAVIGATION_TIMING)
+		except WebDriverException as ex:
+			Log.logger.info("Navigation timing unavailable: {}".format(ex))
+		metrics = cls._cdp_metrics(driver)
+		if metrics:
+			record['cdp'] = metrics
+		timings = getattr(driver, '_page_timings', None)
+		if timings is None:
+			timings = []
+			setattr(driver, '_page_timings', timings)
+		timings.append(record)
+		return record
+
+	@classmethod
+	def take(cls, driver):
+		"""Remove and return the timing records held for a driver.
+
+		Returns:
+			[dict]: the records in load order
+		"""
+		timings = getattr(driver, '_page_timings', None) or []
+		setattr(driver, '_page_timings', [])
+		return timings
+
+	@classmethod
+	def _cdp_metrics(cls, driver):
+		"""Get the Chrome DevTools performance metrics.
+
+		Returns:
+			{str: float}: metric values by name, None if not available
+		"""
+		capabilities = getattr(driver, 'capabilities', None) or {}
+		if capabilities.get('browserName') != 'chrome' or \
+			getattr(driver, '_cdp_unavailable', False):
+			return None
+		try:
+			if not getattr(driver, '_cdp_performance', False):
+				cls._cdp(driver, 'Performance.enable')
+				setattr(driver, '_cdp_performance', True)
+			result = cls._cdp(driver, 'Performance.getMetrics')
+			return dict((metric['name'], metric['value'])
+				for metric in result.get('metrics', []))
+		except Exception:
+			# e.g. remote (Sauce) sessions without the DevTools command
+			setattr(driver, '_cdp_unavailable', True)
+			return None
+
+	@staticmethod
+	def _cdp(driver, cmd, params=None):
+		response = driver.execute("executeCdpCommand",
+			{'cmd': cmd, 'params': params or {}})
+		return response['value']
@@ -0,0 +1,162 @@
+import atexit
+import os
+import threading
+import time
+
+from automations.utils.backoff import Backoff
+from automations.utils.log import Log
+from automations.utils.shared_json import SharedJson
+
+"""Location of the wait history file, override with env var POLL_HISTORY_PATH
+"""
+HISTORY_PATH = os.environ.get('POLL_HISTORY_PATH',
+	os.path.join(os.getcwd(), "output", "poll_history.json"))
+
+
+class PollHistory(object):
+	"""Per-locator wait resolution times, persisted to a local JSON file so
+	that later runs can start polling at a suitable rate.
+	"""
+
+	# number of recent samples kept per locator
+	samples = 20
+
+	# minimum samples before a locator is checked for latency regressions
+	min_samples = 5
+
+	# a wait is flagged if it takes this many times longer than typical...
+	regression_factor = 3.0
+
+	# ...and at least this much longer (seconds)
+	regression_margin = 2.0
+
+	_lock = threading.Lock()
+	_history = None
+	_recorded = {}
+
+	@classmethod
+	def typical(cls, key):
+		"""Get the typical (median) resolution time for a locator.
+
+		Args:
+			key (str): the locator key
+
+		Returns:
+			float: median time (seconds) or None if there is no history
+		"""
+		with cls._lock:
+			times = cls._load().get(key)
+			if not times:
+				return None
+			return cls._median(times)
+
+	@classmethod
+	def record(cls, key, elapsed):
+		"""Record a resolution time, warning if it is far slower than typical.
+
+		Args:
+			key (str): the locator key
+			elapsed (float): time taken to resolve (seconds)
+		"""
+		with cls._lock:
+			history = cls._load()
+			times = history.setdefault(key, [])
+			if len(times) >= cls.min_samples:
+				median = cls._median(times)
+				if elapsed > max(median * cls.regression_factor,
+					median + cls.regression_margin):
+					Log.logger.warn("Slow wait for {}: {:.2f}s, typically {:.2f}s"
+						.format(key, elapsed, median))
+			times.append(round(elapsed, 3))
+			del times[:-cls.samples]
+			cls._recorded.setdefault(key, []).append(round(elapsed, 3))
+
+	@classmethod
+	def save(cls):
+		"""Merge this run's samples into the history file.
+		"""
+		with cls._lock:
+			if not cls._recorded:
+				return
+
+			def merge(history):
+				for key, times in cls._recorded.items():
+					merged = history.setdefault(key, []) + times
+					history[key] = merged[-cls.samples:]
+				return history
+
+			try:
+				# other workers merge into the same file
+				SharedJson(HISTORY_PATH).merge(merge)
+				cls._recorded = {}
+			except Exception as ex:
+				Log.logger.warn("Failed to save wait history: {}".format(ex))
+
+	@classmethod
+	def _load(cls):
+		"""Lazy load of the history file (call holding the lock).
+		"""
+		if cls._history is None:
+			cls._history = cls._read()
+		return cls._history
+
+	@classmethod
+	def _read(cls):
+		"""Read the history file.
+
+		Returns:
+			{str: [float]}: times by locator key, empty if unavailable
+		"""
+		return SharedJson(HISTORY_PATH).read()
+
+	@staticmethod
+	def _median(times):
+		ordered = sorted(times)
+		return ordered[len(ordered) // 2]
+
+atexit.register(PollHistory.save)
+
+###############################################################################
+
+class PollScheduler(object):
+	"""Tick scheduler for waits.
+
+	Starts with fast ticks and backs off exponentially with jitter. If the
+	locator has history the first tick is based on it's typical resolution
+	time, so routinely slow waits don't start by hammering the driver.
+	"""
+
+	initial = 0.05
+	factor = 1.5
+	maximum = 1.0
+	jitter = 0.2
+
+	def __init__(self, key=None):
+		"""New scheduler.
+
+		Args:
+			key (str): optional locator key for recording resolution history
+		"""
+		self.key = key
+		self.start = time.time()
+		first = self.initial
+		if key:
+			typical = PollHistory.typical(key)
+			if typical:
+				first = min(max(typical / 4, self.initial), self.maximum)
+		self.backoff = Backoff(first, factor=self.factor, maximum=self.maximum,
+			jitter=self.jitter)
+
+	def next_tick(self):
+		"""Get the time to wait before the next attempt.
+
+		Returns:
+			float: the tick (seconds)
+		"""
+		return self.backoff.next()
+
+	def resolved(self):
+		"""Record that the wait has resolved.
+		"""
+		if self.key:
+			PollHistory.record(self.key, time.time() - self.start)
@@ -0,0 +1,167 @@
+import atexit
+import json
+import os
+import threading
+
+from automations.utils.backoff import Backoff
+from automations.utils.log import Log
+from automations.utils.shared_json import SharedJson
+
+"""Location of the retry statistics file, override with env var RETRY_STATS_PATH
+"""
+STATS_PATH = os.environ.get('RETRY_STATS_PATH',
+	os.path.join(os.getcwd(), "output", "retry_stats.json"))
+
+
+class RetryPolicy(object):
+	"""How element actions are retried on failure.
+
+	The policy for an action is taken from (in order) the call, the element
+	or it's nearest parent with a retry_policy (e.g. a Section), then
+	RetryPolicy.default. Policies can override themselves per action name,
+	e.g. RetryPolicy(actions={'click': RetryPolicy(attempts=5)}).
+	"""
+
+	default = None
+
+	def __init__(self, attempts=3, delay=1.0, factor=1.0, maximum=None,
+		jitter=0.0, retry_on=(Exception,), actions=None):
+		"""New retry policy.
+
+		Args:
+			attempts (int): max attempts including the first
+			delay (float): delay before the first retry (seconds)
+			factor (float): multiplier applied to the delay after each retry
+			maximum (float): upper limit for the delay (seconds)
+			jitter (float): proportion of each delay to randomly vary by
+			retry_on (tuple): exception classes that are retried
+			actions ({str: RetryPolicy}): overrides by action name
+		"""
+		self.attempts = max(1, attempts)
+		self.delay = delay
+		self.factor = factor
+		self.maximum = maximum
+		self.jitter = jitter
+		self.retry_on = tuple(retry_on)
+		self.actions = dict(actions or {})
+
+	@classmethod
+	def resolve(cls, element, action=None, policy=None):
+		"""Get the policy for an action on an element.
+
+		Args:
+			element (BaseElement): the element the action is performed on
+			action (str): the action name
+			policy (RetryPolicy): a policy given for this call
+
+		Returns:
+			RetryPolicy: the policy to use
+		"""
+		node = element
+		while policy is None and node is not None:
+			policy = getattr(node, 'retry_policy', None)
+			node = getattr(node, '_container', None) or node.parent
+		if policy is None:
+			policy = cls.default
+		return policy.for_action(action)
+
+	def for_action(self, action):
+		"""Get the override for an action, or this policy.
+		"""
+		return self.actions.get(action, self)
+
+	def retryable(self, ex):
+		"""Check if an exception should be retried.
+		"""
+		return isinstance(ex, self.retry_on)
+
+	def backoff(self):
+		"""Get a new delay sequence for this policy.
+
+		Returns:
+			Backoff: the delays between attempts
+		"""
+		return Backoff(self.delay, factor=self.factor, maximum=self.maximum,
+			jitter=self.jitter)
+
+RetryPolicy.default = RetryPolicy()
+
+###############################################################################
+
+class RetryStats(object):
+	"""Per-element action retry counters, merged into a local JSON file at
+	exit so the elements costing the most recovery time can be found.
+	"""
+
+	_lock = threading.Lock()
+	_stats = {}
+
+	@classmethod
+	def record(cls, element, action, retries, elapsed, failed=False):
+		"""Record an action that needed retries.
+
+		Args:
+			element (BaseElement): the element
+			action (str): the action name
+			retries (int): number of retries made
+			elapsed (float): time from the first attempt to completion (seconds)
+			failed (bool): True if the action finally failed
+		"""
+		if not retries and not failed:
+			return
+		key = element.description or element.name or "[Unknown]"
+		with cls._lock:
+			stats = cls._stats.setdefault(key, cls._empty())
+			cls._add(stats, {
+				'retries': retries,
+				'recovered': 0 if failed else 1,
+				'failed': 1 if failed else 0,
+				'seconds': elapsed,
+				'actions': {action or 'action': retries}
+			})
+
+	@classmethod
+	def snapshot(cls):
+		"""Get this run's counters.
+
+		Returns:
+			{str: dict}: retries, recovered, failed, seconds and retries by
+				action for each element description
+		"""
+		with cls._lock:
+			return json.loads(json.dumps(cls._stats))
+
+	@classmethod
+	def save(cls):
+		"""Add this run's counters to the statistics file.
+		"""
+		with cls._lock:
+			if not cls._stats:
+				return
+
+			def merge(merged):
+				for key, stats in cls._stats.items():
+					cls._add(merged.setdefault(key, cls._empty()), stats)
+				return merged
+
+			try:
+				# other workers merge into the same file
+				SharedJson(STATS_PATH).merge(merge, indent=1, sort_keys=True)
+				cls._stats = {}
+			except Exception as ex:
+				Log.logger.warn("Failed to save retry stats: {}".format(ex))
+
+	@staticmethod
+	def _empty():
+		return {'retries': 0, 'recovered': 0, 'failed': 0, 'seconds': 0.0,
+			'actions': {}}
+
+	@staticmethod
+	def _add(stats, other):
+		for name in ('retries', 'recovered', 'failed'):
+			stats[name] += other[name]
+		stats['seconds'] = round(stats['seconds'] + other['seconds'], 3)
+		for action, retries in other['actions'].items():
+			stats['actions'][action] = stats['actions'].get(action, 0) + retries
+
+atexit.register(RetryStats.save)
@@ -0,0 +1,347 @@
+"""Browser side scripts used by the element layer to reduce WebDriver round
+trips.
+
+All scripts are prefixed with the PRELUDE which defines the shared helpers
+(visibility, text, queries, condition checks and the DOM change observer) so
+that the page side behaviour is consistent wherever it is evaluated.
+"""
+
+PRELUDE = """
+var __a = {
+	displayed: function(el) {
+		if (!el || el.nodeType !== 1) return false;
+		if (!document.documentElement.contains(el)) return false;
+		var tag = el.tagName.toLowerCase();
+		if (tag === 'input' && (el.type || '').toLowerCase() === 'hidden') return false;
+		for (var e = el; e && e.nodeType === 1; e = e.parentElement) {
+			var style = window.getComputedStyle(e);
+			if (style.display === 'none' || style.opacity === '0') return false;
+			if (e === el && (style.visibility === 'hidden' || style.visibility === 'collapse')) return false;
+		}
+		var rect = el.getBoundingClientRect();
+		if (rect.width > 0 && rect.height > 0) return true;
+		for (var i = 0; i < el.children.length; i++) {
+			var child = el.children[i].getBoundingClientRect();
+			if (child.width > 0 && child.height > 0) return true;
+		}
+		return false;
+	},
+	enabled: function(el) {
+		return !el.disabled;
+	},
+	selected: function(el) {
+		return !!(el.selected || el.checked);
+	},
+	setValue: function(el, value) {
+		// native setter so framework value tracking sees the change
+		var tag = el.tagName.toLowerCase(), proto = null;
+		if (el.readOnly || el.disabled) return null;
+		if (tag === 'input' && /^(checkbox|radio)$/i.test(el.type)) {
+			if (typeof value !== 'boolean') return null;
+			if (el.checked !== value) el.click();
+			return el.checked === value;
+		}
+		if (typeof value !== 'string') return null;
+		if (tag === 'input') proto = window.HTMLInputElement.prototype;
+		else if (tag === 'textarea') proto = window.HTMLTextAreaElement.prototype;
+		if (!proto) return null;
+		if (tag === 'input' && /^(file|button|submit|reset|image|hidden|range|color)$/i.test(el.type)) return null;
+		var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+		if (!descriptor || !descriptor.set) return null;
+		if (document.activeElement !== el && el.focus) el.focus();
+		descriptor.set.call(el, value);
+		el.dispatchEvent(new Event('input', {bubbles: true}));
+		el.dispatchEvent(new Event('change', {bubbles: true}));
+		return el.value === value;
+	},
+	attribute: function(el, name) {
+		var value = el[name];
+		if (typeof value === 'boolean') return value ? 'true' : null;
+		if (typeof value === 'string' || typeof value === 'number') return String(value);
+		return el.getAttribute(name);
+	},
+	text: function(el) {
+		if (!__a.displayed(el)) return '';
+		var lines = (el.innerText || el.textContent || '').replace(/\\u00a0/g, ' ').split('\\n');
+		var result = [];
+		for (var i = 0; i < lines.length; i++) {
+			var line = lines[i].replace(/[ \\t\\f\\v\\r]+/g, ' ').replace(/^ +| +$/g, '');
+			if (line.length) result.push(line);
+		}
+		return result.join('\\n');
+	},
+	query: function(root, by, value) {
+		var found, i;
+		if (by === 'css selector') {
+			found = root.querySelectorAll(value);
+		} else if (by === 'class name') {
+			if (/\\s/.test(value)) return null;
+			found = root.getElementsByClassName(value);
+		} else if (by === 'tag name') {
+			found = root.getElementsByTagName(value);
+		} else if (by === 'id' && root === document) {
+			found = document.getElementById(value);
+			found = found ? [found] : [];
+		} else if (by === 'name' && root === document) {
+			found = document.getElementsByName(value);
+		} else if (by === 'id' || by === 'name') {
+			// elements have no by id/name lookups, match the attribute
+			found = root.querySelectorAll('[' + by + '="' +
+				value.replace(/["\\\\]/g, '\\\\$&') + '"]');
+		} else if (by === 'xpath') {
+			if (!document.evaluate) return null;
+			var snapshot = document.evaluate(value, root, null,
+				XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+			found = [];
+			for (i = 0; i < snapshot.snapshotLength; i++) {
+				var node = snapshot.snapshotItem(i);
+				if (node.nodeType !== 1) return null;
+				found.push(node);
+			}
+		} else {
+			return null;
+		}
+		return Array.prototype.slice.call(found);
+	},
+	passes: function(el, conditions) {
+		for (var i = 0; i < conditions.length; i++) {
+			var c = conditions[i];
+			var ok;
+			switch (c[0]) {
+				case 'visible': ok = __a.displayed(el); break;
+				case 'invisible': ok = !__a.displayed(el); break;
+				case 'enabled': ok = __a.enabled(el); break;
+				case 'disabled': ok = !__a.enabled(el); break;
+				case 'clickable': ok = __a.displayed(el) && __a.enabled(el); break;
+				case 'selected': ok = __a.selected(el); break;
+				case 'not_selected': ok = !__a.selected(el); break;
+				case 'text': ok = __a.displayed(el) && __a.text(el).indexOf(c[1]) !== -1; break;
+				default: throw new Error('Unknown condition: ' + c[0]);
+			}
+			if (!ok) return false;
+		}
+		return true;
+	},
+	observe: function() {
+		var dom = window.__automationsDom;
+		if (!dom) {
+			dom = window.__automationsDom = {
+				token: Math.random().toString(36).slice(2),
+				generation: 0,
+				listeners: []
+			};
+			var bump = function() {
+				dom.generation++;
+				var listeners = dom.listeners;
+				dom.listeners = [];
+				for (var i = 0; i < listeners.length; i++) listeners[i]();
+			};
+			if (window.MutationObserver) {
+				new MutationObserver(bump).observe(document, {childList: true,
+					subtree: true, attributes: true, characterData: true});
+			}
+			window.addEventListener('load', bump);
+			window.addEventListener('hashchange', bump);
+			window.addEventListener('popstate', bump);
+		}
+		return dom.token + ':' + dom.generation;
+	},
+	locate: function(root, levels) {
+		var context = root || document;
+		var parents = [];
+		for (var i = 0; i < levels.length; i++) {
+			var level = levels[i];
+			var matches = __a.query(context, level.by, level.value);
+			if (matches === null) return {status: 'unsupported', level: i};
+			var passing = [];
+			for (var j = 0; j < matches.length; j++) {
+				if (__a.passes(matches[j], level.conditions)) passing.push(matches[j]);
+			}
+			if (i < levels.length - 1) {
+				if (passing.length !== 1) {
+					return {status: 'missing', level: i, count: passing.length};
+				}
+				context = passing[0];
+				parents.push(passing[0]);
+			} else {
+				return {status: 'found', parents: parents, matches: passing};
+			}
+		}
+		return {status: 'unsupported', level: 0};
+	}
+};
+"""
+
+# arguments: root WebElement (or null for the document), chain levels,
+# whether to report the DOM state
+LOCATE_CHAIN = PRELUDE + """
+var result = __a.locate(arguments[0], arguments[1]);
+if (arguments[2]) result.state = __a.observe();
+return result;
+"""
+
+# arguments: candidate WebElements, condition keys
+FILTER_CONDITIONS = PRELUDE + """
+var elements = arguments[0], conditions = arguments[1], passing = [];
+for (var i = 0; i < elements.length; i++) {
+	if (__a.passes(elements[i], conditions)) passing.push(i);
+}
+return passing;
+"""
+
+# arguments: last seen DOM state (or null), max wait (ms), settle time (ms),
+# async callback
+AWAIT_DOM_CHANGE = PRELUDE + """
+var seen = arguments[0], timeout = arguments[1], settle = arguments[2];
+var done = arguments[arguments.length - 1];
+var current = __a.observe();
+if (seen !== null && seen !== current) {
+	done(current);
+	return;
+}
+var dom = window.__automationsDom;
+var finished = false, timer = null, settleTimer = null;
+var finish = function() {
+	if (finished) return;
+	finished = true;
+	clearTimeout(timer);
+	clearTimeout(settleTimer);
+	done(__a.observe());
+};
+var changed = function() {
+	if (finished) return;
+	if (!settleTimer) settleTimer = setTimeout(finish, settle);
+	dom.listeners.push(changed);
+};
+dom.listeners.push(changed);
+timer = setTimeout(finish, timeout);
+"""
+
+# returns the current frame's DOM state
+DOM_STATE = PRELUDE + """
+return __a.observe();
+"""
+
+# arguments: WebElements, value to read ('text', 'attribute', 'properties' or
+# 'rect'), attribute name or property names
+READ_ELEMENTS = PRELUDE + """
+var elements = arguments[0], kind = arguments[1], arg = arguments[2];
+var primitive = function(value) {
+	var type = typeof value;
+	return type === 'string' || type === 'number' || type === 'boolean' ? value : null;
+};
+var values = [];
+for (var i = 0; i < elements.length; i++) {
+	var el = elements[i], value = null, j;
+	if (kind === 'text') {
+		value = __a.text(el);
+	} else if (kind === 'attribute') {
+		value = __a.attribute(el, arg);
+	} else if (kind === 'properties') {
+		value = {};
+		for (j = 0; j < arg.length; j++) value[arg[j]] = primitive(el[arg[j]]);
+	} else if (kind === 'rect') {
+		var rect = el.getBoundingClientRect();
+		value = {x: rect.left + window.pageXOffset, y: rect.top + window.pageYOffset,
+			width: rect.width, height: rect.height};
+	}
+	values.push(value);
+}
+return values;
+"""
+
+# arguments: WebElements, predicates (['text', 'exact'|'substring'|'regex',
+# text], ['attribute', name, value], ['relative', xpath]), returns the indexes
+# of elements matching all predicates or null if a regex isn't valid in JS
+MATCH_ELEMENTS = PRELUDE + """
+var elements = arguments[0], predicates = arguments[1], patterns = [];
+for (var p = 0; p < predicates.length; p++) {
+	patterns.push(null);
+	if (predicates[p][0] === 'text' && predicates[p][1] === 'regex') {
+		// python re.match only anchors at the start
+		try { patterns[p] = new RegExp('^(?:' + predicates[p][2] + ')'); }
+		catch (e) { return null; }
+	}
+}
+var matching = [];
+for (var i = 0; i < elements.length; i++) {
+	var el = elements[i], text = null, ok = true;
+	for (p = 0; p < predicates.length && ok; p++) {
+		var predicate = predicates[p];
+		if (predicate[0] === 'text') {
+			if (text === null) text = __a.text(el);
+			if (predicate[1] === 'regex') ok = patterns[p].test(text);
+			else if (predicate[1] === 'substring') ok = text.indexOf(predicate[2]) !== -1;
+			else ok = text === predicate[2];
+		} else if (predicate[0] === 'attribute') {
+			ok = __a.attribute(el, predicate[1]) === predicate[2];
+		} else if (predicate[0] === 'relative') {
+			ok = document.evaluate(predicate[1], el, null,
+				XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+		} else {
+			throw new Error('Unknown predicate: ' + predicate[0]);
+		}
+	}
+	if (ok) matching.push(i);
+}
+return matching;
+"""
+
+# arguments: input/textarea WebElement, text; returns true if the value took,
+# null if the field can't be set by script (see __a.setValue)
+SET_VALUE = PRELUDE + """
+return __a.setValue(arguments[0], arguments[1]);
+"""
+
+# arguments: root WebElement (or null for the document), fields ([{levels,
+# value}]); fields are located with __a.locate and set with __a.setValue
+FILL_FIELDS = PRELUDE + """
+var root = arguments[0], fields = arguments[1];
+var statuses = [], elements = [];
+for (var i = 0; i < fields.length; i++) {
+	var located = __a.locate(root, fields[i].levels), status = 'missing', el = null;
+	if (located.status === 'unsupported') {
+		status = 'unsupported';
+	} else if (located.status === 'found' && located.matches.length === 1) {
+		el = located.matches[0];
+		var set = __a.setValue(el, fields[i].value);
+		status = set === null ? 'unsupported' : set ? 'set' : 'failed';
+	}
+	statuses.push(status);
+	elements.push(el);
+}
+return {statuses: statuses, elements: elements};
+"""
+
+# no arguments; navigation timing of the current document (relative to the
+# navigation start, ms) and a summary of it's resources
+NAVIGATION_TIMING = """
+var perf = window.performance;
+if (!perf) return null;
+var round = function(value) { return value ? Math.round(value) : null; };
+var result = {};
+var navigation = perf.getEntriesByType ? perf.getEntriesByType('navigation')[0] : null;
+if (navigation) {
+	result.ttfb = round(navigation.responseStart);
+	result.dom_content_loaded = round(navigation.domContentLoadedEventEnd);
+	result.load = round(navigation.loadEventEnd);
+	result.transfer_size = navigation.transferSize;
+	result.encoded_size = navigation.encodedBodySize;
+} else if (perf.timing) {
+	var t = perf.timing, start = t.navigationStart;
+	result.ttfb = round(t.responseStart - start);
+	result.dom_content_loaded = round(t.domContentLoadedEventEnd - start);
+	result.load = t.loadEventEnd ? round(t.loadEventEnd - start) : null;
+}
+var resources = perf.getEntriesByType ? perf.getEntriesByType('resource') : [];
+var transfer = 0, encoded = 0, slowest = [];
+for (var i = 0; i < resources.length; i++) {
+	transfer += resources[i].transferSize || 0;
+	encoded += resources[i].encodedBodySize || 0;
+	slowest.push({name: resources[i].name, duration: round(resources[i].duration)});
+}
+slowest.sort(function(a, b) { return b.duration - a.duration; });
+result.resources = {count: resources.length, transfer_size: transfer,
+	encoded_size: encoded, slowest: slowest.slice(0, 5)};
+return result;
+"""
@@ -0,0 +1,305 @@
+import re
+
+from selenium.webdriver.common.by import By
+
+from automations.utils.log import Log
+
+IDENTIFIER = re.compile(r'^-?[_a-zA-Z][\w-]*$')
+COMPOUND = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$')
+PART = re.compile(r'#[\w-]+|\.[\w-]+|\[[^\]]+\]')
+ID_STEP = re.compile(r"""\[\s*@id\s*=\s*(?:'[^']*'|"[^"]*")\s*\]$""")
+# XPath steps that leave the parent's subtree
+NON_DESCENDANT = re.compile(r'\.\.|\b(?:ancestor|ancestor-or-self|following|following-sibling|preceding|preceding-sibling|parent)::')
+ATTRIBUTE = re.compile(r'''^\[\s*(?P<name>[\w-]+)\s*(?:(?P<op>[*^]?=)\s*(?P<value>"[^"]*"|'[^']*'|[\w-]+)\s*)?\]$''')
+
+
+class SelectorCompiler(object):
+	"""Flattens parent/child selectors into a single selector so that a chain
+	of page object definitions needs one lookup instead of one per level.
+
+	CSS, class name, id, name and tag name pairs combine into CSS. Pairs
+	involving XPath combine into XPath where the parent selector is unique (by
+	id) and the child only steps down into the parent's subtree, converting
+	simple CSS (tags, ids, classes, attributes, descendant and child
+	combinators) to XPath as required. Otherwise "the first parent, then it's
+	child" could become "the first child of any parent" (e.g. positions and
+	sibling axes).
+	"""
+
+	# (parent, child) descriptions of chains that could not be flattened
+	unflattened = set()
+
+	@classmethod
+	def combine(cls, parent_by, parent_value, by, value):
+		"""Combine a parent and child selector.
+
+		Args:
+			parent_by (By): the parent Selenium BY
+			parent_value (str): the parent query string
+			by (By): the child Selenium BY
+			value (str): the child query string
+
+		Returns:
+			(By, str): the combined selector, or None if they can't be combined
+		"""
+		parent_css = cls.to_css(parent_by, parent_value)
+		child_css = cls.to_css(by, value)
+		if parent_css is not None and child_css is not None:
+			return (By.CSS_SELECTOR, parent_css + " " + child_css)
+
+		if not cls.is_unique(parent_by, parent_value):
+			return None
+		parent_xpath = cls.to_xpath(parent_by, parent_value)
+		if parent_xpath is None:
+			return None
+		if by == By.XPATH:
+			child_xpath = cls.relative_xpath(value)
+		elif child_css is not None:
+			child_xpath = cls.css_to_xpath(child_css)
+			if child_xpath is not None:
+				# descendants of the parent
+				child_xpath = child_xpath[1:]
+		else:
+			child_xpath = None
+		if child_xpath is None:
+			return None
+		return (By.XPATH, parent_xpath + child_xpath)
+
+	@classmethod
+	def is_unique(cls, by, value):
+		"""Check if a selector can only match one element (it's last step
+		selects an id).
+
+		Returns:
+			bool: True if unique
+		"""
+		if by == By.ID:
+			return True
+		if by == By.CSS_SELECTOR:
+			tokens = cls._tokenize(value)
+			if not tokens or tokens[-1] == '>' or not COMPOUND.match(tokens[-1]):
+				return False
+			return any(part.startswith('#') for part in PART.findall(tokens[-1]))
+		if by == By.XPATH:
+			return not cls._has_top_level(value, '|') and \
+				ID_STEP.search(value.strip()) is not None
+		return False
+
+	@classmethod
+	def report(cls, parent, child):
+		"""Log (once) a parent/child chain that could not be flattened.
+
+		Args:
+			parent (BaseElement): the parent element
+			child (BaseElement): the child element
+		"""
+		chain = (parent.description, child.description)
+		if chain not in cls.unflattened:
+			cls.unflattened.add(chain)
+			Log.logger.info("Selector chain not flattened: {} >> {}"
+				.format(*chain))
+
+	@classmethod
+	def to_css(cls, by, value):
+		"""Express a selector as CSS.
+
+		Returns:
+			str: the CSS selector, or None if not possible
+		"""
+		if by == By.CSS_SELECTOR:
+			return value if not cls._has_top_level(value, ',') else None
+		if by == By.CLASS_NAME:
+			return "." + value if IDENTIFIER.match(value) else None
+		if by == By.ID:
+			return "#" + value if IDENTIFIER.match(value) else None
+		if by == By.TAG_NAME:
+			return value if IDENTIFIER.match(value) else None
+		if by == By.NAME:
+			literal = cls._css_literal(value)
+			return "[name={}]".format(literal) if literal else None
+		return None
+
+	@classmethod
+	def to_xpath(cls, by, value):
+		"""Express a selector as an XPath relative to the search context.
+
+		Returns:
+			str: the XPath, or None if not possible
+		"""
+		if by == By.XPATH:
+			return value if not cls._has_top_level(value, '|') else None
+		css = cls.to_css(by, value)
+		if css is not None:
+			return cls.css_to_xpath(css)
+		return None
+
+	@classmethod
+	def relative_xpath(cls, value):
+		"""Get a child XPath as a suffix to be appended to it's parent XPath.
+
+		Returns:
+			str: the suffix, or None if the XPath is not relative to it's
+				parent (e.g. starts at the document root), leaves the parent's
+				subtree or is not a simple path
+		"""
+		if value.startswith('/') or value.startswith('(') or \
+			cls._has_top_level(value, '|') or NON_DESCENDANT.search(value):
+			return None
+		if value.startswith('./'):
+			return value[1:]
+		if value == '.':
+			return ''
+		return "/" + value
+
+	@classmethod
+	def css_to_xpath(cls, css):
+		"""Convert a simple CSS selector to an XPath relative to the search
+		context (descendants).
+
+		Returns:
+			str: the XPath (starting './/'), or None if the selector uses
+				unsupported CSS
+		"""
+		tokens = cls._tokenize(css)
+		if not tokens:
+			return None
+		xpath = "."
+		axis = "//"
+		for token in tokens:
+			if token == '>':
+				if axis != "//" or xpath == ".":
+					return None
+				axis = "/"
+				continue
+			step = cls._compound_to_xpath(token)
+			if step is None:
+				return None
+			xpath = xpath + axis + step
+			axis = "//"
+		if axis != "//":
+			return None
+		return xpath
+
+	###########################################################################
+
+	@classmethod
+	def _compound_to_xpath(cls, compound):
+		"""Convert a compound CSS selector (e.g. input.field[name='x'])
+		to an XPath step.
+		"""
+		match = COMPOUND.match(compound)
+		if not match:
+			return None
+		predicates = []
+		for part in PART.findall(match.group('rest') or ''):
+			if part.startswith('#'):
+				predicates.append("@id='{}'".format(part[1:]))
+			elif part.startswith('.'):
+				predicates.append("contains(concat(' ', normalize-space(@class), "
+					"' '), ' {} ')".format(part[1:]))
+			else:
+				predicate = cls._attribute_to_xpath(part)
+				if predicate is None:
+					return None
+				predicates.append(predicate)
+		step = match.group('tag') or '*'
+		for predicate in predicates:
+			step = step + "[" + predicate + "]"
+		return step
+
+	@classmethod
+	def _attribute_to_xpath(cls, part):
+		"""Convert a CSS attribute selector to an XPath predicate.
+		"""
+		match = ATTRIBUTE.match(part)
+		if not match:
+			return None
+		name = "@" + match.group('name')
+		if not match.group('op'):
+			return name
+		value = match.group('value')
+		if value[0] in "'\"":
+			value = value[1:-1]
+		literal = cls._xpath_literal(value)
+		if literal is None:
+			return None
+		if match.group('op') == '*=':
+			return "contains({}, {})".format(name, literal)
+		if match.group('op') == '^=':
+			return "starts-with({}, {})".format(name, literal)
+		return "{}={}".format(name, literal)
+
+	@classmethod
+	def _tokenize(cls, css):
+		"""Split CSS into compound selectors and '>' combinators.
+
+		Returns:
+			[str]: the tokens, or None for unsupported combinators
+		"""
+		tokens = []
+		current = ''
+		depth = 0
+		quote = None
+		for char in css.strip():
+			if quote:
+				current += char
+				if char == quote:
+					quote = None
+			elif char in "'\"" and depth:
+				quote = char
+				current += char
+			elif char == '[':
+				depth += 1
+				current += char
+			elif char == ']':
+				depth -= 1
+				current += char
+			elif depth == 0 and (char.isspace() or char == '>'):
+				if current:
+					tokens.append(current)
+					current = ''
+				if char == '>':
+					tokens.append(char)
+			elif depth == 0 and char in ',+~:':
+				return None
+			else:
+				current += char
+		if current:
+			tokens.append(current)
+		return tokens
+
+	@staticmethod
+	def _has_top_level(value, char):
+		"""Check if a char appears outside of brackets and quotes.
+		"""
+		depth = 0
+		quote = None
+		for c in value:
+			if quote:
+				if c == quote:
+					quote = None
+			elif c in "'\"":
+				quote = c
+			elif c in '[(':
+				depth += 1
+			elif c in '])':
+				depth -= 1
+			elif c == char and depth == 0:
+				return True
+		return False
+
+	@staticmethod
+	def _xpath_literal(value):
+		if "'" not in value:
+			return "'{}'".format(value)
+		if '"' not in value:
+			return '"{}"'.format(value)
+		return None
+
+	@staticmethod
+	def _css_literal(value):
+		if "'" not in value and '\\' not in value:
+			return "'{}'".format(value)
+		if '"' not in value and '\\' not in value:
+			return '"{}"'.format(value)
+		return None
@@ -0,0 +1,209 @@
+PRIMITIVES = (str, unicode, int, long, float, bool, type(None))
+
+# element attributes that are bound per instance rather than copied
+BOUND_ATTRS = ('driver', 'parent', 'conditions', 'web_element', 'web_elements',
+	'_web_element_state', '_template')
+
+
+class LocatorTemplate(object):
+	"""Page object definitions compiled once per class.
+
+	The first instance of a page/section class runs setup() as normal and the
+	resulting element definitions are captured. Later instances skip setup()
+	and bind to the template, building each element (with the instance
+	driver) the first time it is accessed.
+
+	Templating is opt-in per class (cache_setup = True) as only the results
+	of setup() are captured, not what it read: a setup() that depends on
+	instance state would silently give every instance the first one's
+	selectors. As a guard an instance only binds if it was constructed with
+	the same selector and name as the captured instance, otherwise it runs
+	setup(). Classes whose setup() creates anything other than elements and
+	primitive values (or references elements outside of the instance) are not
+	templated and always run setup().
+	"""
+
+	_templates = {}
+
+	def __init__(self, definitions, values, key=None):
+		"""New template.
+
+		Args:
+			definitions ({str: dict}): element definitions by attribute name
+			values ({str: object}): primitive attribute values by name
+			key (tuple): the captured instance's key (see instance_key)
+		"""
+		self.definitions = definitions
+		self.values = values
+		self.key = key
+
+	@staticmethod
+	def instance_key(instance):
+		"""Get the construction state an instance's setup() can depend on.
+
+		Returns:
+			tuple: selector and name
+		"""
+		return (instance.by, instance.value, instance.name)
+
+	def matches(self, instance):
+		"""Check an instance can be bound to this template.
+
+		Args:
+			instance (BaseElement): the instance, before setup()
+
+		Returns:
+			bool: True if constructed the same as the captured instance
+		"""
+		return self.key == self.instance_key(instance)
+
+	@classmethod
+	def for_class(cls, element_class):
+		"""Get the template for a class.
+
+		Returns:
+			LocatorTemplate: the template, None if not yet captured, False if
+				the class can't be templated
+		"""
+		return cls._templates.get(element_class)
+
+	@classmethod
+	def capture(cls, instance, existing, key):
+		"""Capture the template for an instance's class after setup().
+
+		Args:
+			instance (BaseElement): the instance setup() has been run on
+			existing (set): attribute names present before setup()
+			key (tuple): the instance key before setup() (see instance_key)
+		"""
+		added = [attr for attr in vars(instance) if attr not in existing]
+		template = cls._capture(instance, added)
+		if template:
+			template.key = key
+		cls._templates[type(instance)] = template or False
+
+	@classmethod
+	def _capture(cls, instance, added):
+		"""Build the template for the attributes added by setup().
+
+		Returns:
+			LocatorTemplate: the template or None if it can't be templated
+		"""
+		from automations.core.base_element import BaseElement
+
+		elements = {}
+		values = {}
+		for attr in added:
+			value = getattr(instance, attr)
+			if isinstance(value, BaseElement):
+				elements.setdefault(id(value), attr)
+			elif isinstance(value, PRIMITIVES):
+				values[attr] = value
+			else:
+				return None
+
+		definitions = {}
+		for attr in added:
+			child = getattr(instance, attr)
+			if not isinstance(child, BaseElement):
+				continue
+			if elements[id(child)] != attr:
+				# another name for the same element
+				definitions[attr] = {'alias': elements[id(child)]}
+				continue
+			# the container is the defining element when the parent has been
+			# combined away
+			parent = cls._reference(instance, elements, child.parent)
+			container = cls._reference(instance, elements, child._container)
+			if parent is False or container is False:
+				return None
+
+			state = {}
+			for name, value in vars(child).items():
+				if name in BOUND_ATTRS or isinstance(value, BaseElement):
+					continue
+				if not isinstance(value, PRIMITIVES):
+					return None
+				state[name] = value
+
+			definitions[attr] = {
+				'class': type(child),
+				'parent': parent,
+				'container': container,
+				'state': state,
+				'conditions': child.conditions.copy()
+			}
+		return cls(definitions, values)
+
+	@staticmethod
+	def _reference(instance, elements, element):
+		"""Get how a captured element refers to another.
+
+		Returns:
+			str: None for no element, '' for the instance, otherwise the
+				attribute name, False if it's outside of the instance
+		"""
+		if element is None:
+			return None
+		if element is instance:
+			return ''
+		return elements.get(id(element), False)
+
+	@staticmethod
+	def _resolve(instance, reference):
+		"""Get the element a captured reference (see _reference) is to.
+		"""
+		if reference is None:
+			return None
+		if reference == '':
+			return instance
+		return getattr(instance, reference)
+
+	def bind(self, instance):
+		"""Bind an instance to this template in place of running setup().
+
+		Args:
+			instance (BaseElement): the new instance
+		"""
+		instance.__dict__.update(self.values)
+		instance._template = self
+
+	def build(self, instance, attr):
+		"""Build an element for an instance the first time it is accessed.
+
+		Args:
+			instance (BaseElement): the bound instance
+			attr (str): the attribute name
+
+		Returns:
+			BaseElement: the element, also set on the instance
+		"""
+		from automations.core.element import Iframe, Section
+
+		definition = self.definitions[attr]
+		if 'alias' in definition:
+			child = getattr(instance, definition['alias'])
+			setattr(instance, attr, child)
+			return child
+
+		parent = self._resolve(instance, definition['parent'])
+
+		state = definition['state']
+		element_class = definition['class']
+		if issubclass(element_class, Section):
+			child = element_class(instance.driver)
+		else:
+			child = element_class(instance.driver, by=state.get('by'),
+				value=state.get('value'), parent=parent, name=state.get('name'))
+		child.__dict__.update(state)
+		child.parent = parent
+		child._container = self._resolve(instance, definition['container'])
+		child.conditions = definition['conditions'].copy()
+
+		if not isinstance(child, Iframe):
+			child.combine_selectors()
+		if isinstance(child, Section):
+			child._compile_pending = True
+
+		setattr(instance, attr, child)
+		return child
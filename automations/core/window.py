@@ -4,6 +4,8 @@ import time
 from selenium.common.exceptions import NoSuchFrameException
 
 from automations.core.base_element import TIMEOUT
+from automations.core.dom_observer import DomObserver
+from automations.core.frame_context import FrameContext
 from automations.utils.log import Log
 
 
@@ -53,11 +55,14 @@ class WindowMixin(object):
 		Returns:
 			window: the new window
 		"""
+		DomObserver.for_driver(self.driver).touch()
 		new_window_index = len(set(self.driver.window_handles))
 		self.driver.execute_script('''window.open("about:blank", "_blank");''')
-		self.wait_until(lambda _: len(self.driver.window_handles) > new_window_index)
+		self.wait_until(lambda _: len(self.driver.window_handles) > new_window_index,
+			event_driven=False)
 		self.driver.switch_to_window(self.driver.window_handles[new_window_index])
 		self.driver.get(url)
+		FrameContext.for_driver(self.driver).top_level()
 		return self.driver.window_handles[new_window_index]
 
 	def open_window(self, action):
@@ -69,11 +74,14 @@ class WindowMixin(object):
 		Returns:
 			window: the new window
 		"""
+		DomObserver.for_driver(self.driver).touch()
 		window_handles = set(self.driver.window_handles)
 		action(self)
-		self.wait_until(lambda _: len(self.driver.window_handles) > len(window_handles))
+		self.wait_until(lambda _: len(self.driver.window_handles) > len(window_handles),
+			event_driven=False)
 		new_window_handle = (set(self.driver.window_handles) - window_handles).pop()
 		self.driver.switch_to.window(new_window_handle)
+		FrameContext.for_driver(self.driver).top_level()
 		return new_window_handle
 
 	def switch_to_window(self, window=None, index=0):
@@ -83,10 +91,12 @@ class WindowMixin(object):
 			window (Window): the window reference
 			index (int): the window index
 		"""
+		DomObserver.for_driver(self.driver).touch()
 		if window:
 			self.driver.switch_to.window(window)
 		else:
 			self.driver.switch_to.window(self.driver.window_handles[index])
+		FrameContext.for_driver(self.driver).top_level()
 
 	def refresh(self, timeout=TIMEOUT):
 		"""Refresh the current page.
@@ -94,6 +104,7 @@ class WindowMixin(object):
 		Args:
 			timeout (int): timeout for page load
 		"""
+		DomObserver.for_driver(self.driver).touch()
 		# first try the refresh with 1 retry on exception
 		try:
 			self.driver.refresh()
@@ -105,6 +116,7 @@ class WindowMixin(object):
 				# finally log and raise the last exception
 				msg = "Error refreshing page [{} >> {}]".format(self.name, self.url)
 				raise Exception, msg, sys.exc_info()[2]
+		FrameContext.for_driver(self.driver).top_level()
 
 		# accept the alert if present
 		try:
@@ -125,6 +137,7 @@ class WindowMixin(object):
 	def close_tab(self):
 		"""Close the current tab.
 		"""
+		DomObserver.for_driver(self.driver).touch()
 		try:
 			self.driver.close()
 		except:
@@ -135,6 +148,7 @@ class WindowMixin(object):
 				# finally log and raise the last exception
 				msg = "Error closing tab [{} >> {}]".format(self.name, self.url)
 				raise Exception, msg, sys.exc_info()[2]
+		FrameContext.for_driver(self.driver).reset()
 
 		# accept the alert if present
 		try:
@@ -148,14 +162,15 @@ class WindowMixin(object):
 		Returns
 			(str, [str]): the base page source and an array of frame sources
 		"""
-		self.driver.switch_to.default_content()
+		context = FrameContext.for_driver(self.driver)
+		context.default()
 		page_source = self.driver.page_source.encode("UTF-8")
 		frame_sources = []
 		iframes = self.list_by_selector("iframe", "Page iFrames")
 		for iframe in iframes.all():
-			self.driver.switch_to.default_content()
+			context.default()
 			try:
-				iframe.driver.switch_to.frame(iframe.web_element)
+				context.enter(iframe.web_element)
 				frame_sources.append(self.driver.page_source.encode("UTF-8"))
 			except NoSuchFrameException:
 				# an iframe element existing does not guarantee it
@@ -0,0 +1,191 @@
+import atexit
+import json
+import threading
+import urlparse
+
+# imported first so it's exit handler (stopping chromedriver) runs after drain
+from automations.driver_services import ChromeDriverService
+from automations.profile_templates import ProfileTemplate
+from automations.utils.log import Log
+
+
+class SessionPool(object):
+	"""Warm WebDriver sessions shared between tests in a worker, keyed by the
+	launch capabilities.
+
+	Released sessions are reset (extra windows closed, cookies and storage
+	cleared for every origin visited, about:blank loaded) and handed to the next test requesting the
+	same capabilities. A session is quit instead after max_uses tests or if
+	it fails the health check or reset. Idle sessions are quit at exit.
+
+	Only local sessions are pooled, a remote (Sauce) session is one job so it
+	can't be shared between tests.
+	"""
+
+	# tests a session is used for before it is replaced
+	max_uses = 20
+
+	_lock = threading.Lock()
+	_idle = {}
+
+	@classmethod
+	def key(cls, *capabilities):
+		"""Get the pool key for a set of capabilities.
+
+		Args:
+			capabilities ((dict)): capabilities/options maps used to launch
+
+		Returns:
+			str: the key
+		"""
+		return json.dumps(capabilities, sort_keys=True, default=str)
+
+	@classmethod
+	def acquire(cls, key, launch):
+		"""Get a healthy idle session for the key, or launch a new one.
+
+		Args:
+			key (str): the pool key (see SessionPool.key)
+			launch (fn): creates a new driver
+
+		Returns:
+			WebDriver: the driver
+		"""
+		while True:
+			with cls._lock:
+				idle = cls._idle.get(key)
+				driver = idle.pop() if idle else None
+			if driver is None:
+				break
+			if cls.health(driver):
+				Log.logger.info("Reusing pooled session {} ({} previous uses)"
+					.format(driver.session_id, driver._pool_uses))
+				return driver
+			cls._quit(driver)
+
+		driver = launch()
+		driver._pool_key = key
+		driver._pool_uses = 0
+		return driver
+
+	@classmethod
+	def release(cls, driver):
+		"""Return a driver to the pool, quitting it if it's worn out or can't
+		be reset.
+
+		Args:
+			driver (WebDriver): the driver from acquire
+		"""
+		key = getattr(driver, '_pool_key', None)
+		if key is None:
+			cls._quit(driver)
+			return
+		driver._pool_uses += 1
+		if driver._pool_uses >= cls.max_uses or not cls.reset(driver):
+			cls._quit(driver)
+			return
+		with cls._lock:
+			cls._idle.setdefault(key, []).append(driver)
+
+	@classmethod
+	def health(cls, driver):
+		"""Check a session still responds.
+
+		Returns:
+			bool: True if healthy
+		"""
+		try:
+			driver.window_handles
+			return True
+		except Exception:
+			return False
+
+	@classmethod
+	def reset(cls, driver):
+		"""Reset a session to a blank state for the next test.
+
+		Storage (local, IndexedDB, cache storage etc.) is cleared by DevTools
+		command for every origin in the navigation history of each window and
+		every cookie's domain, which covers origins left by redirects (e.g.
+		SSO). Session storage is cleared for the page open at release.
+
+		Returns:
+			bool: True if reset
+		"""
+		try:
+			origins = set()
+			handles = driver.window_handles
+			# the first window is left current
+			for handle in reversed(handles):
+				driver.switch_to.window(handle)
+				origins.update(cls._history_origins(driver))
+				if handle != handles[0]:
+					driver.close()
+			driver.switch_to.default_content()
+			try:
+				driver.execute_script("try { window.sessionStorage.clear(); } "
+					"catch (e) {}")
+			except Exception:
+				pass
+			# by command as sessions on the shared service are Remote, a
+			# session that can't be cleared is quit rather than reused
+			for cookie in cls._cdp(driver, 'Network.getAllCookies')['cookies']:
+				domain = cookie['domain'].lstrip('.')
+				origins.update(("https://" + domain, "http://" + domain))
+			for origin in sorted(origins):
+				cls._cdp(driver, 'Storage.clearDataForOrigin',
+					{'origin': origin, 'storageTypes': 'all'})
+			cls._cdp(driver, 'Network.clearBrowserCookies')
+			driver.get("about:blank")
+		except Exception as ex:
+			Log.logger.warn("Failed to reset pooled session {}: {}"
+				.format(driver.session_id, ex))
+			return False
+
+		# drop per-page state held by the element layer
+		for attr in ('_dom_observer', '_frame_context', '_action_batch'):
+			if hasattr(driver, attr):
+				delattr(driver, attr)
+		return True
+
+	@classmethod
+	def _history_origins(cls, driver):
+		"""Get the web origins in the current window's navigation history.
+
+		Returns:
+			[str]: the origins, e.g. https://example.com:8080
+		"""
+		origins = []
+		history = cls._cdp(driver, 'Page.getNavigationHistory')
+		for entry in history['entries']:
+			url = urlparse.urlparse(entry['url'])
+			if url.scheme in ('http', 'https') and url.hostname:
+				origins.append("{}://{}".format(url.scheme,
+					url.netloc.rpartition('@')[2]))
+		return origins
+
+	@staticmethod
+	def _cdp(driver, cmd, params=None):
+		response = driver.execute("executeCdpCommand",
+			{'cmd': cmd, 'params': params or {}})
+		return response['value']
+
+	@classmethod
+	def drain(cls):
+		"""Quit all idle sessions.
+		"""
+		with cls._lock:
+			drivers = [driver for idle in cls._idle.values() for driver in idle]
+			cls._idle = {}
+		for driver in drivers:
+			cls._quit(driver)
+
+	@staticmethod
+	def _quit(driver):
+		try:
+			driver.quit()
+		except Exception:
+			Log.logger.warn("Exception quiting pooled driver")
+		ProfileTemplate.release(driver)
+
+atexit.register(SessionPool.drain)
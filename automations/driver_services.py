@@ -0,0 +1,142 @@
+import atexit
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.chrome.service import Service
+
+from automations.utils.log import Log
+
+
+class ChromeSession(webdriver.Remote):
+	"""A Remote session on the shared service, with the Chrome specific
+	commands of webdriver.Chrome (e.g. execute_cdp_cmd).
+	"""
+
+for _name in ('launch_app', 'get_network_conditions', 'set_network_conditions',
+	'execute_cdp_cmd'):
+	if _name in vars(webdriver.Chrome):
+		setattr(ChromeSession, _name, vars(webdriver.Chrome)[_name])
+
+
+class ChromeDriverService(object):
+	"""A long-lived chromedriver process shared by all local Chrome sessions in
+	a worker, rather than a chromedriver started per driver.
+
+	Sessions are created against the service URL (see ChromeSession). The
+	service is restarted if it has died when a session is requested and is
+	stopped at exit, after the session pool has been drained.
+	"""
+
+	_lock = threading.Lock()
+	_instance = None
+
+	def __init__(self, executable_path='chromedriver'):
+		"""New (not yet started) service.
+
+		Args:
+			executable_path (str): the chromedriver executable
+		"""
+		self.executable_path = executable_path
+		self.service = None
+		self.starts = 0
+		self.sessions = 0
+
+	@classmethod
+	def instance(cls):
+		"""Get the worker's service, creating it on first use.
+
+		Returns:
+			ChromeDriverService: the service
+		"""
+		with cls._lock:
+			if cls._instance is None:
+				cls._instance = cls()
+			return cls._instance
+
+	@classmethod
+	def shutdown(cls):
+		"""Stop the worker's service if it was started.
+		"""
+		if cls._instance is not None:
+			cls._instance.stop()
+
+	def session(self, capabilities, options):
+		"""Start a new Chrome session on the service.
+
+		Args:
+			capabilities ({str, str}): browser capabilities map
+			options (ChromeOptions): chrome options
+
+		Returns:
+			WebDriver: the created driver
+		"""
+		url = self.ensure_running()
+		desired_capabilities = dict(capabilities)
+		desired_capabilities.update(options.to_capabilities())
+		driver = ChromeSession(
+			command_executor=ChromeRemoteConnection(url, keep_alive=True),
+			desired_capabilities=desired_capabilities)
+		with self._lock:
+			self.sessions += 1
+		return driver
+
+	def ensure_running(self):
+		"""Start the service, or restart it if it has died.
+
+		Returns:
+			str: the service URL
+		"""
+		with self._lock:
+			if self.service is not None and not self._alive():
+				Log.logger.warn("chromedriver service has died, restarting")
+				self._stop()
+			if self.service is None:
+				self.service = Service(self.executable_path)
+				self.service.start()
+				self.starts += 1
+			return self.service.service_url
+
+	def health(self):
+		"""Get the service status.
+
+		Returns:
+			dict: running, url, starts (including restarts) and sessions
+				created
+		"""
+		with self._lock:
+			running = self.service is not None and self._alive()
+			return {
+				'running': running,
+				'url': self.service.service_url if running else None,
+				'starts': self.starts,
+				'sessions': self.sessions
+			}
+
+	def stop(self):
+		"""Stop the service (any sessions still open will fail).
+		"""
+		with self._lock:
+			self._stop()
+
+	def _alive(self):
+		"""Check the process is running and accepting connections (call
+		holding the lock).
+		"""
+		process = getattr(self.service, 'process', None)
+		if process is None or process.poll() is not None:
+			return False
+		return self.service.is_connectable()
+
+	def _stop(self):
+		if self.service is not None:
+			try:
+				self.service.stop()
+			except Exception as ex:
+				Log.logger.warn("Error stopping chromedriver service: {}"
+					.format(ex))
+			self.service = None
+
+# registered on import (before the session pool's drain, see driver_pool) so
+# it runs after any pooled sessions have been quit
+atexit.register(ChromeDriverService.shutdown)
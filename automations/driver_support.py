@@ -2,6 +2,7 @@ import functools
 import hmac
 import logging
 import os
+import sys
 import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed, wait
@@ -13,8 +14,16 @@ from selenium.common.exceptions import TimeoutException
 
 from automations.browsers import Browsers
 from automations.config_support import Config
+from automations.core.page_timing import PageTiming
+from automations.driver_pool import SessionPool
+from automations.driver_services import ChromeDriverService
+from automations.launch_profiles import LaunchProfiles
+from automations.profile_templates import ProfileTemplate
+from automations.remote_connection import PooledConnectionMixin
+from automations.utils.backoff import Backoff
 from automations.utils.log import Log
-from automations.utils.parallel import Concurrent
+from automations.utils.metrics import Metrics
+from automations.utils.parallel import Concurrent, ConcurrentError
 
 logger = logging.getLogger("LOG") # outputs to main console during Jenkins runs
 
@@ -58,6 +67,7 @@ class DriverSupport(object):
 		"""Initialise the basic config (and sauce client if requested).
 		"""
 		cls.config = Config.instance()
+		SessionPool.max_uses = cls.config['session_pool_max_uses']
 		if cls.config['use_sauce']:
 			if not hasattr(cls, 'sauce'):
 				cls.sauce = SauceClient(
@@ -137,6 +147,9 @@ class DriverSupport(object):
 	def load_drivers(self, drivers):
 		"""Load additional drivers to the defined request_drivers.
 
+		Drivers are launched (and prepared) concurrently, failures for all
+		drivers are raised together in a ConcurrentError.
+
 		Args:
 			drivers ((str)): driver names tuple
 		"""
@@ -144,15 +157,19 @@ class DriverSupport(object):
 		self.driver_logged = False
 		driver_launcher = Concurrent()
 
-		concurrent_launch = self.is_chrome()
-
 		for driver_name in drivers:
-			if concurrent_launch:
-				driver_launcher.add(self.load_and_prepare_driver, driver_name)
-			else:
-				self.load_and_prepare_driver(driver_name)
-		if concurrent_launch:
-			driver_launcher.run()
+			driver_launcher.add(self.load_and_prepare_driver, driver_name)
+		try:
+			# bounded by config 'launch_concurrency' (e.g. Sauce slots per
+			# worker), 0 launches all at once
+			driver_launcher.run(threads=self.config['launch_concurrency'])
+		except ConcurrentError:
+			# don't leave the drivers that did launch running
+			self.quit_all_drivers()
+			for driver_name in drivers:
+				if hasattr(self, driver_name):
+					delattr(self, driver_name)
+			raise
 
 	def load_and_prepare_driver(self, driver_name):
 		"""Load the requested driver and invoke it's prepare method if any.
@@ -196,7 +213,9 @@ class DriverSupport(object):
 		desired_capabilities = self.get_desired_capabilities(driver_name)
 
 		if self.config['use_sauce']:
-			driver = self.launch_remote(desired_capabilities)
+			driver = self._acquire_driver(
+				lambda: self.launch_remote(desired_capabilities),
+				desired_capabilities)
 			token = hmac.new(str(self.config['sauce_auth_string']),
 				driver.session_id, md5).hexdigest()
 
@@ -222,19 +241,35 @@ class DriverSupport(object):
 				self.sauce.jobs.update_job(driver.session_id,
 					**self.sauce_test_metadata)
 		else:
-			chrome_options = webdriver.ChromeOptions()
-			chrome_options.add_argument('--disable-gpu')
-			prefs = {"profile.default_content_setting_values.notifications": 2,
-				'credentials_enable_service': False}
-			chrome_options.add_experimental_option("prefs", prefs)
-			driver = self.launch_chrome(desired_capabilities, chrome_options)
+			chrome_options = LaunchProfiles.chrome_options(self.config)
+			driver = self._acquire_driver(
+				lambda: self.launch_chrome_profile(desired_capabilities,
+					chrome_options),
+				desired_capabilities, chrome_options.to_capabilities())
 
 			self.requested_drivers.add(driver_name)
 			setattr(self, driver_name, driver)
 			setattr(driver, 'driver_name', driver_name)
 
+	def _acquire_driver(self, launch, *capabilities):
+		"""Launch a driver, or take a warm one from the session pool if
+		enabled (config 'use_session_pool') for local sessions. Sauce sessions
+		aren't pooled as each is a job named and marked for one test.
+
+		Args:
+			launch (fn): creates a new driver
+			capabilities ((dict)): capabilities/options the driver is launched
+				with, the pool key
+
+		Returns:
+			WebDriver: the driver
+		"""
+		if not self.config['use_session_pool'] or self.config['use_sauce']:
+			return launch()
+		return SessionPool.acquire(SessionPool.key(*capabilities), launch)
+
 	def launch_remote(self, capabilities):
-		"""Create a remote webdriver with one retry.
+		"""Create a remote webdriver, retrying on failure (see _launch).
 
 		Args:
 			desired_capabilities ({str, str}):browser capabilities map
@@ -242,16 +277,15 @@ class DriverSupport(object):
 		Returns:
 			WebDriver: the created driver
 		"""
-		try:
-			return webdriver.Remote(desired_capabilities=capabilities,
-				command_executor=self.config['sauce_url'])
-		except:
-			time.sleep(2)
-			return webdriver.Remote(desired_capabilities=capabilities,
-				command_executor=self.config['sauce_url'])
+		return self._launch(lambda: webdriver.Remote(
+			desired_capabilities=capabilities,
+			command_executor=self.config['sauce_url']), capabilities)
 
 	def launch_chrome(self, capabilities, options):
-		"""Create a local Chrome webdriver with one retry.
+		"""Create a local Chrome webdriver, retrying on failure (see _launch).
+
+		Sessions are created on the worker's shared chromedriver service
+		unless config 'shared_chromedriver' is off.
 
 		Args:
 			desired_capabilities ({str, str}): browser capabilities map
@@ -260,13 +294,100 @@ class DriverSupport(object):
 		Returns:
 			WebDriver: the created driver
 		"""
-		try:
-			return webdriver.Chrome('chromedriver',
-				desired_capabilities=capabilities, chrome_options=options)
-		except:
-			time.sleep(2)
-			return webdriver.Chrome('chromedriver',
+		if self.config['shared_chromedriver']:
+			launch = lambda: ChromeDriverService.instance().session(
+				capabilities, options)
+		else:
+			launch = lambda: webdriver.Chrome('chromedriver',
 				desired_capabilities=capabilities, chrome_options=options)
+		return self._launch(launch, capabilities)
+
+	def launch_chrome_profile(self, capabilities, options):
+		"""Create a local Chrome webdriver on a copy of the worker's warmed
+		profile template if config 'profile_template' is on (see
+		ProfileTemplate), otherwise as launch_chrome.
+
+		The template is built on first use by loading config
+		'profile_warm_urls' (comma separated). The session's copy is removed
+		when the driver is quit.
+
+		Args:
+			capabilities ({str, str}): browser capabilities map
+			options (ChromeOptions): chrome options
+
+		Returns:
+			WebDriver: the created driver
+		"""
+		if not self.config['profile_template']:
+			return self.launch_chrome(capabilities, options)
+
+		warm_urls = [url.strip() for url
+			in self.config['profile_warm_urls'].split(',') if url.strip()]
+		template = ProfileTemplate.instance(lambda path: self.launch_chrome(
+			capabilities, ProfileTemplate.options_for(options, path)),
+			warm_urls)
+		path = template.new_profile()
+		try:
+			driver = self.launch_chrome(capabilities,
+				ProfileTemplate.options_for(options, path))
+		except Exception:
+			template.discard(path)
+			raise
+		driver._profile_dir = path
+		return driver
+
+	def _launch(self, launch, capabilities):
+		"""Launch a driver with retries and record the launch metrics.
+
+		Makes up to config 'launch_attempts' attempts with exponential backoff
+		(from config 'launch_backoff' seconds) and jitter between them. Each
+		launch is recorded as a 'launch' event in the metrics file with it's
+		latency, retries and failure classes, latencies are also aggregated
+		per browser in the 'launch_seconds' histogram.
+
+		Unless config 'pooled_transport' is off the driver's commands are then
+		sent through a pooled keep-alive connection (see PooledConnectionMixin).
+
+		Args:
+			launch (fn): creates the driver
+			capabilities ({str, str}): browser capabilities map
+
+		Returns:
+			WebDriver: the created driver
+		"""
+		label = "{} {} {}".format(capabilities.get('browserName'),
+			capabilities.get('version', ''), capabilities.get('platform', ''))
+		attempts = max(1, self.config['launch_attempts'])
+		backoff = Backoff(self.config['launch_backoff'], factor=2.0,
+			maximum=30.0, jitter=0.3)
+		failures = []
+		start = time.time()
+		for attempt in range(1, attempts + 1):
+			attempt_start = time.time()
+			try:
+				driver = launch()
+			except Exception as ex:
+				exc_info = sys.exc_info()
+				failures.append(type(ex).__name__)
+				Log.logger.warn("Driver launch attempt {}/{} failed for [{}]: "
+					"{}".format(attempt, attempts, label, ex))
+				if attempt == attempts:
+					Metrics.record('launch', label=label, ok=False,
+						seconds=round(time.time() - start, 3),
+						retries=attempt - 1, failures=failures)
+					raise exc_info[0], exc_info[1], exc_info[2]
+				backoff.sleep()
+				continue
+
+			seconds = time.time() - attempt_start
+			Metrics.observe('launch_seconds', label, seconds)
+			Metrics.record('launch', label=label, ok=True,
+				seconds=round(seconds, 3),
+				total_seconds=round(time.time() - start, 3),
+				retries=attempt - 1, failures=failures)
+			if self.config['pooled_transport']:
+				PooledConnectionMixin.install(driver, self.config)
+			return driver
 
 	def is_chrome(self):
 		"""Check if the current browser being lanuched is Chrome.
@@ -280,14 +401,37 @@ class DriverSupport(object):
 
 	def cleanup_drivers(self):
 		"""Test cleaup (teardown).
+
+		Each driver is quit (or returned to the session pool) and it's Sauce
+		job notified concurrently, see _run_per_driver.
 		"""
-		self.quit_all_drivers()
-		self.notify_sauce()
+		def finish(driver_name, driver):
+			self._record_page_timings(driver_name, driver)
+			try:
+				self._quit_driver(driver)
+			finally:
+				if self.config['use_sauce']:
+					self._notify_sauce_job_with_retry(driver)
+
+		self._run_per_driver(finish, "finishing driver")
 
 		if self.requested_drivers:
 			for driver_name in self.requested_drivers:
 				if hasattr(self, driver_name):
 					delattr(self, driver_name)
+		self.requested_drivers = set()
+
+	def _record_page_timings(self, driver_name, driver):
+		"""Write the page load timings captured for a driver during the test
+		to the metrics file as 'page_load' events.
+
+		Args:
+			driver_name (str): the driver name
+			driver (WebDriver): the driver
+		"""
+		test = getattr(self, 'current_test_name', None)
+		for timing in PageTiming.take(driver):
+			Metrics.record('page_load', test=test, driver=driver_name, **timing)
 
 	def all_drivers(self):
 		"""Get all active drivers.
@@ -303,37 +447,75 @@ class DriverSupport(object):
 		return drivers
 
 	def quit_all_drivers(self):
-		"""Send a quit command to all active drivers.
+		"""Send a quit command to all active drivers (or return them to the
+		session pool).
 		"""
-		if self.requested_drivers:
-			for driver_name in self.requested_drivers:
-				try:
-					if hasattr(self, driver_name):
-						driver = getattr(self, driver_name)
-						if driver:
-							driver.quit()
-				except:
-					Log.logger.warn("Exception quiting driver")
-					pass
+		self._run_per_driver(lambda driver_name, driver:
+			self._quit_driver(driver), "quiting driver")
 		self.requested_drivers = set()
 
+	def _quit_driver(self, driver):
+		if self.config['use_session_pool']:
+			SessionPool.release(driver)
+		else:
+			try:
+				driver.quit()
+			finally:
+				ProfileTemplate.release(driver)
+
+	def _run_per_driver(self, task, action):
+		"""Run a task for every active driver concurrently.
+
+		At most config 'teardown_concurrency' (0 for all) drivers are handled
+		at once, waiting no longer than config 'teardown_timeout' seconds
+		overall. Failures and timeouts are logged per driver.
+
+		Args:
+			task (fn): called with the driver name and driver
+			action (str): description of the task for logging
+
+		Returns:
+			{str: object}: task result by driver name for completed tasks
+		"""
+		drivers = [(driver_name, driver) for driver_name, driver
+			in self.all_drivers() if driver]
+		if not drivers:
+			return {}
+
+		workers = min(self.config['teardown_concurrency'] or len(drivers),
+			len(drivers))
+		pool = ThreadPoolExecutor(workers)
+		futures = dict((pool.submit(task, driver_name, driver), driver_name)
+			for driver_name, driver in drivers)
+		done, pending = wait(futures, timeout=self.config['teardown_timeout'])
+		pool.shutdown(wait=False)
+
+		results = {}
+		for future in done:
+			if future.exception() is not None:
+				Log.logger.warn("{} >> Exception {}: {}".format(
+					futures[future], action, future.exception()))
+			else:
+				results[futures[future]] = future.result()
+		for future in pending:
+			future.cancel()
+			Log.logger.warn("{} >> Timed out {}".format(futures[future], action))
+		return results
+
 	def log_all_consoles(self):
 		"""Executed on completion of a test but still withing the test and
 		before cleanup.
 
-		Defaults to logging the driver/browser consoles.
+		Defaults to logging the driver/browser consoles (see
+		log_browser_console), read from all drivers concurrently. Each line
+		is prefixed with it's driver name.
 		"""
 		if self.requested_drivers:
 			self.log_info("JS CONSOLE LOGS")
 			self.log_separator()
-			for driver_name in self.requested_drivers:
-				try:
-					if hasattr(self, driver_name):
-						driver = getattr(self, driver_name)
-						if driver:
-							self.log_browser_console(driver, driver_name)
-				except:
-					pass
+			self._run_per_driver(lambda driver_name, driver:
+				self.log_browser_console(driver, driver_name),
+				"reading JS console")
 			self.log_info_end()
 
 	def log_browser_console(self, driver, driver_name):
@@ -362,19 +544,15 @@ class DriverSupport(object):
 		if not self.config['use_sauce']:
 			return
 
-		if self.requested_drivers:
-			for driver_name in self.requested_drivers:
-				try:
-					if hasattr(self, driver_name):
-						driver = getattr(self, driver_name)
-						if driver:
-							try:
-								self.notify_sauce_job(driver, failed)
-							except:
-								self.notify_sauce_job(driver, failed)
-				except:
-					Log.logger.warn("Exception finishing Sauce job")
-					pass
+		self._run_per_driver(lambda driver_name, driver:
+			self._notify_sauce_job_with_retry(driver, failed),
+			"finishing Sauce job")
+
+	def _notify_sauce_job_with_retry(self, driver, failed=False):
+		try:
+			self.notify_sauce_job(driver, failed)
+		except:
+			self.notify_sauce_job(driver, failed)
 
 	def notify_sauce_job(self, driver, failed=False):
 		"""Notify a sauce job of completion.
@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+from selenium import webdriver
+
+# prefs applied to every local Chrome launch
+DEFAULT_PREFS = {
+	"profile.default_content_setting_values.notifications": 2,
+	'credentials_enable_service': False
+}
+
+# shared (between sessions and runs) disk cache location for the fast profile
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "automations-chrome-cache")
+
+
+class LaunchProfiles(object):
+	"""Named local Chrome launch profiles, selected with env var CHROME_PROFILE
+	(config 'chrome_profile').
+
+	default: headed Chrome as always launched.
+
+	fast: headless with extensions, background networking, component updates
+		and other background work disabled, a fixed window size
+		(CHROME_WINDOW_SIZE, default 1366,768) and a disk cache shared between
+		sessions (unless on a profile template, which keeps its warmed cache,
+		see ProfileTemplate). Set CHROME_BLOCK_IMAGES=1 to also skip loading
+		images.
+	"""
+
+	@classmethod
+	def chrome_options(cls, config, name=None):
+		"""Build the Chrome options for a profile.
+
+		Args:
+			config (Config): the config
+			name (str): the profile name, defaults to config 'chrome_profile'
+
+		Returns:
+			ChromeOptions: the options
+		"""
+		name = name or config['chrome_profile'] or "default"
+		profile = getattr(cls, "profile_" + name, None)
+		if profile is None:
+			raise Exception("Unknown Chrome launch profile: {}".format(name))
+
+		options = webdriver.ChromeOptions()
+		prefs = dict(DEFAULT_PREFS)
+		profile(options, prefs, config)
+		options.add_experimental_option("prefs", prefs)
+		return options
+
+	@classmethod
+	def profile_default(cls, options, prefs, config):
+		options.add_argument('--disable-gpu')
+
+	@classmethod
+	def profile_fast(cls, options, prefs, config):
+		cls.profile_default(options, prefs, config)
+		for argument in (
+			'--headless',
+			'--disable-extensions',
+			'--disable-background-networking',
+			'--disable-component-update',
+			'--disable-default-apps',
+			'--disable-sync',
+			'--disable-translate',
+			'--disable-background-timer-throttling',
+			'--disable-renderer-backgrounding',
+			'--disable-dev-shm-usage',
+			'--no-first-run',
+			'--mute-audio',
+			'--hide-scrollbars',
+			'--window-size={}'.format(config['chrome_window_size']),
+			'--disk-cache-dir={}'.format(CACHE_DIR)):
+			options.add_argument(argument)
+		if config['chrome_block_images']:
+			prefs["profile.managed_default_content_settings.images"] = 2
@@ -24,9 +24,8 @@ class EvpnSignIn(Section):
                         password (str): the agent password
                 """
                 self.email.clear(timeout=120) # allow for a long load period
-                self.email.set_text(email)
-                self.password.set_text(password)
-                self.signin_button.click()
+                self.fill([(self.email, email), (self.password, password)],
+                        submit=self.signin_button)
 
         def forgot_password(self,email):
                 """reset the password
@@ -0,0 +1,182 @@
+import atexit
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from automations.utils.log import Log
+
+# profile lock files that must not be copied
+LOCK_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket', 'lockfile')
+
+
+class ProfileTemplate(object):
+	"""A pre-warmed Chrome user data dir built once per worker, copied for
+	each session so that the first page load behaves like a returning user
+	(HTTP and code caches primed, service workers installed, first-run done).
+
+	The template is built by launching Chrome on an empty profile and loading
+	the warm URLs. Chrome rewrites cache entries in place so nothing is shared
+	with the template, each session gets a full copy: a copy-on-write clone
+	where the filesystem supports it (cp --reflink=auto on Linux, which
+	otherwise copies), a plain copy elsewhere. The cache is kept in the
+	profile (any --disk-cache-dir is dropped) so the warmed cache is used.
+	Copies are removed when the driver is quit, and everything is removed at
+	exit.
+	"""
+
+	# time allowed after the warm loads for caches/service workers to settle
+	settle = 2.0
+
+	_lock = threading.Lock()
+	_instance = None
+
+	def __init__(self, path):
+		"""New template.
+
+		Args:
+			path (str): the built template profile directory
+		"""
+		self.path = path
+		self.profiles = set()
+
+	@classmethod
+	def instance(cls, launch, warm_urls):
+		"""Get the worker's template, building it on first use.
+
+		Args:
+			launch (fn): launches a driver given an options transform
+				(see ProfileTemplate.options_for)
+			warm_urls ([str]): URLs to load into the template
+
+		Returns:
+			ProfileTemplate: the template
+		"""
+		with cls._lock:
+			if cls._instance is None:
+				cls._instance = cls._build(launch, warm_urls)
+			return cls._instance
+
+	@classmethod
+	def _build(cls, launch, warm_urls):
+		"""Build the template profile.
+		"""
+		path = tempfile.mkdtemp(prefix="automations-profile-template-")
+		start = time.time()
+		try:
+			driver = launch(path)
+			try:
+				for url in warm_urls:
+					driver.get(url)
+				time.sleep(cls.settle)
+			finally:
+				driver.quit()
+			cls._remove_locks(path)
+		except Exception:
+			shutil.rmtree(path, ignore_errors=True)
+			raise
+		Log.logger.info("Built Chrome profile template in {:.1f}s: {}"
+			.format(time.time() - start, path))
+		return cls(path)
+
+	@staticmethod
+	def options_for(options, path):
+		"""Copy Chrome options using a user data dir, with the disk cache in
+		the profile.
+
+		Args:
+			options (ChromeOptions): the options
+			path (str): the user data dir
+
+		Returns:
+			ChromeOptions: the new options
+		"""
+		profile_options = copy.deepcopy(options)
+		arguments = profile_options.arguments
+		arguments[:] = [argument for argument in arguments
+			if not argument.startswith("--disk-cache-dir=")]
+		profile_options.add_argument("--user-data-dir={}".format(path))
+		return profile_options
+
+	def new_profile(self):
+		"""Create a session profile from the template.
+
+		Returns:
+			str: the profile directory
+		"""
+		path = tempfile.mkdtemp(prefix="automations-profile-")
+		try:
+			self._copy(self.path, path)
+			self._remove_locks(path)
+		except Exception:
+			shutil.rmtree(path, ignore_errors=True)
+			raise
+		with self._lock:
+			self.profiles.add(path)
+		return path
+
+	@staticmethod
+	def _copy(source, target):
+		"""Copy the contents of a profile directory into an empty directory.
+		"""
+		if sys.platform.startswith('linux'):
+			# clones (copy-on-write) on btrfs/xfs etc, copies otherwise
+			subprocess.check_call(['cp', '-a', '--reflink=auto',
+				os.path.join(source, '.'), target])
+			return
+		for name in os.listdir(source):
+			source_path = os.path.join(source, name)
+			target_path = os.path.join(target, name)
+			if os.path.islink(source_path):
+				continue
+			if os.path.isdir(source_path):
+				shutil.copytree(source_path, target_path)
+			else:
+				shutil.copy2(source_path, target_path)
+
+	@staticmethod
+	def _remove_locks(path):
+		for name in LOCK_FILES:
+			lock_path = os.path.join(path, name)
+			if os.path.lexists(lock_path):
+				os.remove(lock_path)
+
+	def discard(self, path):
+		"""Remove a session profile.
+
+		Args:
+			path (str): the profile directory from new_profile
+		"""
+		with self._lock:
+			self.profiles.discard(path)
+		shutil.rmtree(path, ignore_errors=True)
+
+	@classmethod
+	def release(cls, driver):
+		"""Remove the session profile of a quit driver, if it has one.
+
+		Args:
+			driver (WebDriver): the driver
+		"""
+		path = getattr(driver, '_profile_dir', None)
+		if path and cls._instance:
+			cls._instance.discard(path)
+			driver._profile_dir = None
+
+	@classmethod
+	def cleanup(cls):
+		"""Remove the template and any remaining session profiles.
+		"""
+		template = cls._instance
+		if template is None:
+			return
+		for path in list(template.profiles):
+			template.discard(path)
+		shutil.rmtree(template.path, ignore_errors=True)
+
+# registered on import so it runs after the session pool has been drained
+atexit.register(ProfileTemplate.cleanup)
@@ -0,0 +1,108 @@
+import time
+
+import urllib3
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from urllib3.util.retry import Retry
+
+from automations.utils.metrics import Metrics
+
+# commands that are safe to resend if the connection drops mid request
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+
+
+class PooledConnectionMixin(object):
+	"""Keep-alive connection pool transport for WebDriver commands.
+
+	Connections to the hub/chromedriver are reused from a bounded pool with
+	separate connect and read timeouts. Connection failures are retried,
+	failures after the request has been sent are only retried for idempotent
+	methods. Per-command latency is aggregated in the 'command_seconds'
+	metrics histogram.
+	"""
+
+	def _init_pool(self, pool_size, connect_timeout, read_timeout, retries):
+		try:
+			retry = Retry(total=retries, connect=retries, read=retries,
+				redirect=0, status=0, backoff_factor=0.1,
+				allowed_methods=IDEMPOTENT_METHODS, raise_on_status=False)
+		except TypeError:
+			# urllib3 < 1.26
+			retry = Retry(total=retries, connect=retries, read=retries,
+				redirect=0, status=0, backoff_factor=0.1,
+				method_whitelist=IDEMPOTENT_METHODS, raise_on_status=False)
+		self.keep_alive = True
+		self._conn = urllib3.PoolManager(maxsize=pool_size, block=False,
+			timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+			retries=retry)
+
+	@classmethod
+	def install(cls, driver, config):
+		"""Replace a driver's command transport with a pooled connection to
+		the same server.
+
+		Args:
+			driver (WebDriver): the driver
+			config (Config): the config ('command_pool_size',
+				'command_connect_timeout', 'command_read_timeout',
+				'command_retries')
+
+		Returns:
+			WebDriver: the driver
+		"""
+		executor = driver.command_executor
+		if isinstance(executor, PooledConnectionMixin):
+			return driver
+		if isinstance(executor, ChromeRemoteConnection):
+			connection_class = PooledChromeRemoteConnection
+		else:
+			connection_class = PooledRemoteConnection
+		connection = connection_class(executor._url,
+			pool_size=config['command_pool_size'],
+			connect_timeout=config['command_connect_timeout'],
+			read_timeout=config['command_read_timeout'],
+			retries=config['command_retries'])
+		if hasattr(executor, 'w3c'):
+			connection.w3c = executor.w3c
+		driver.command_executor = connection
+		return driver
+
+	def execute(self, command, params):
+		start = time.time()
+		try:
+			return super(PooledConnectionMixin, self).execute(command, params)
+		finally:
+			Metrics.observe('command_seconds', command, time.time() - start)
+
+
+class PooledRemoteConnection(PooledConnectionMixin, RemoteConnection):
+	"""Pooled transport for remote (e.g. Sauce) sessions.
+	"""
+
+	def __init__(self, remote_server_addr, pool_size=10, connect_timeout=10,
+		read_timeout=300, retries=2):
+		"""New connection.
+
+		Args:
+			remote_server_addr (str): the hub URL
+			pool_size (int): connections kept open
+			connect_timeout (float): connect timeout (seconds)
+			read_timeout (float): response timeout (seconds)
+			retries (int): max retries per command
+		"""
+		RemoteConnection.__init__(self, remote_server_addr, keep_alive=True,
+			resolve_ip=False)
+		self._init_pool(pool_size, connect_timeout, read_timeout, retries)
+
+
+class PooledChromeRemoteConnection(PooledConnectionMixin,
+	ChromeRemoteConnection):
+	"""Pooled transport for chromedriver sessions (with the Chrome specific
+	commands).
+	"""
+
+	def __init__(self, remote_server_addr, pool_size=10, connect_timeout=10,
+		read_timeout=300, retries=2):
+		ChromeRemoteConnection.__init__(self, remote_server_addr,
+			keep_alive=True)
+		self._init_pool(pool_size, connect_timeout, read_timeout, retries)
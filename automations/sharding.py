@@ -0,0 +1,276 @@
+import argparse
+import atexit
+import heapq
+import importlib
+import json
+import os
+import sys
+import threading
+
+from automations.utils.log import Log
+from automations.utils.shared_json import SharedJson
+
+"""Location of the test class durations file, override with env var
+SHARD_DURATIONS_PATH
+"""
+DURATIONS_PATH = os.environ.get('SHARD_DURATIONS_PATH',
+	os.path.join(os.getcwd(), "output", "class_durations.json"))
+
+# estimate (seconds) for a class with no history and nothing to compare with
+DEFAULT_SECONDS = 60.0
+
+
+class ClassDurations(object):
+	"""Historical test durations, merged into a local JSON file at exit.
+
+	Each test's duration is stored (under 'module:Class.test') as well as the
+	class fixture time (setUpClass and tearDownClass, under 'module:Class'),
+	a class's duration is their sum. Storing tests rather than whole classes
+	keeps the totals right when a class's tests are split between workers.
+
+	The stored durations are moving averages (weighting the latest run by
+	'weight') so the estimates follow tests getting faster or slower.
+	"""
+
+	weight = 0.5
+
+	_lock = threading.Lock()
+	_runs = {}
+
+	@staticmethod
+	def class_id(test_class, test=None):
+		"""Get the id a test class (or one of it's tests) is stored under.
+
+		Args:
+			test_class (class): the test class
+			test (str): the test method name, None for the class fixtures
+
+		Returns:
+			str: 'module:Class' or 'module:Class.test'
+		"""
+		module = test_class.__module__
+		# classes generated by @browsers hold the module itself
+		module = getattr(module, '__name__', module)
+		key = "{}:{}".format(module, test_class.__name__)
+		return "{}.{}".format(key, test) if test else key
+
+	@staticmethod
+	def class_of(key):
+		"""Get the class id of a stored id.
+
+		Returns:
+			str: 'module:Class'
+		"""
+		module, _, rest = key.partition(':')
+		return "{}:{}".format(module, rest.split('.', 1)[0])
+
+	@classmethod
+	def record(cls, test_class, seconds, test=None):
+		"""Record a test run or class fixture time, fixture times in the
+		same process are added together.
+
+		Args:
+			test_class (class): the test class
+			seconds (float): the time taken
+			test (str): the test method name, None for the class fixtures
+		"""
+		key = cls.class_id(test_class, test)
+		with cls._lock:
+			cls._runs[key] = cls._runs.get(key, 0.0) + seconds
+
+	@classmethod
+	def totals(cls, durations=None):
+		"""Get the stored duration of each class (fixtures and tests).
+
+		Args:
+			durations ({str: dict}): stored durations, defaults to those in
+				the durations file
+
+		Returns:
+			{str: float}: seconds by class id
+		"""
+		durations = cls.load() if durations is None else durations
+		totals = {}
+		for key, stored in durations.items():
+			class_key = cls.class_of(key)
+			totals[class_key] = totals.get(class_key, 0.0) + stored['seconds']
+		return totals
+
+	@classmethod
+	def load(cls):
+		"""Read the stored durations.
+
+		Returns:
+			{str: dict}: seconds and runs by class id
+		"""
+		return SharedJson(DURATIONS_PATH).read()
+
+	@classmethod
+	def save(cls):
+		"""Merge this run's durations into the durations file.
+		"""
+		with cls._lock:
+			if not cls._runs:
+				return
+
+			def merge(merged):
+				for key, seconds in cls._runs.items():
+					stored = merged.get(key)
+					if stored:
+						seconds = cls.weight * seconds \
+							+ (1 - cls.weight) * stored['seconds']
+						runs = stored['runs'] + 1
+					else:
+						runs = 1
+					merged[key] = {'seconds': round(seconds, 3), 'runs': runs}
+				return merged
+
+			try:
+				# other workers merge into the same file
+				SharedJson(DURATIONS_PATH).merge(merge, indent=1, sort_keys=True)
+				cls._runs = {}
+			except Exception as ex:
+				Log.logger.warn("Failed to save class durations: {}".format(ex))
+
+atexit.register(ClassDurations.save)
+
+
+class ShardScheduler(object):
+	"""Balances the test classes generated by @browsers across shards (CI
+	nodes/workers) using their historical durations.
+
+	Classes are assigned longest first, each to the shard with the least
+	estimated time so far (LPT). Classes without history are estimated from
+	the average of classes on the same browser, then of all classes.
+	"""
+
+	# registered classes, class id to browser name
+	classes = {}
+
+	@classmethod
+	def register(cls, module, class_name, capabilities):
+		"""Register a generated test class (called by @browsers).
+
+		Args:
+			module (str): the module name
+			class_name (str): the class name
+			capabilities (dict): the class's browser capabilities
+		"""
+		cls.classes["{}:{}".format(module, class_name)] = \
+			capabilities.get('browserName')
+
+	@classmethod
+	def estimates(cls, classes=None, durations=None):
+		"""Estimate the duration of each class.
+
+		Args:
+			classes ({str: str}): browser name by class id, defaults to the
+				registered classes
+			durations ({str: dict}): stored durations, defaults to those in
+				the durations file
+
+		Returns:
+			{str: float}: estimated seconds by class id
+		"""
+		classes = cls.classes if classes is None else classes
+		totals = ClassDurations.totals(durations)
+
+		known = dict((key, totals[key]) for key in classes if key in totals)
+		by_browser = {}
+		for key, seconds in known.items():
+			by_browser.setdefault(classes[key], []).append(seconds)
+		overall = sum(known.values()) / len(known) if known else DEFAULT_SECONDS
+
+		estimates = {}
+		for key, browser in classes.items():
+			if key in known:
+				estimates[key] = known[key]
+			elif browser in by_browser:
+				estimates[key] = sum(by_browser[browser]) \
+					/ len(by_browser[browser])
+			else:
+				estimates[key] = overall
+		return estimates
+
+	@classmethod
+	def assign(cls, shards, estimates=None):
+		"""Assign classes to shards.
+
+		Args:
+			shards (int): number of shards
+			estimates ({str: float}): seconds by class id, defaults to
+				ShardScheduler.estimates()
+
+		Returns:
+			[dict]: per shard, the 'classes' (class ids) and estimated
+				'seconds'
+		"""
+		if shards < 1:
+			raise ValueError("At least one shard is required")
+		estimates = cls.estimates() if estimates is None else estimates
+		assignment = [{'classes': [], 'seconds': 0.0} for _ in range(shards)]
+		heap = [(0.0, index) for index in range(shards)]
+		for key in sorted(estimates, key=lambda key: (-estimates[key], key)):
+			seconds, index = heapq.heappop(heap)
+			assignment[index]['classes'].append(key)
+			assignment[index]['seconds'] = round(seconds + estimates[key], 3)
+			heapq.heappush(heap, (seconds + estimates[key], index))
+		return assignment
+
+	@staticmethod
+	def import_tests(paths):
+		"""Import test modules so their @browsers classes are registered.
+
+		Args:
+			paths ([str]): module names, or test module files/directories
+				(relative to the current directory)
+		"""
+		for path in paths:
+			if os.path.isdir(path):
+				for root, dirs, files in os.walk(path):
+					dirs.sort()
+					for name in sorted(files):
+						if name.startswith("test") and name.endswith(".py"):
+							ShardScheduler.import_tests(
+								[os.path.join(root, name)])
+				continue
+			if path.endswith(".py"):
+				path = os.path.relpath(path)[:-3].replace(os.sep, ".")
+			importlib.import_module(path)
+
+
+def main(argv=None):
+	"""Print the shard assignment for test modules.
+
+	e.g. python -m automations.sharding --shards 4 automations/browser_tests
+	"""
+	parser = argparse.ArgumentParser(description="Assign the @browsers test "
+		"classes to shards using their historical durations.")
+	parser.add_argument('tests', nargs='+',
+		help="test module names, files or directories")
+	parser.add_argument('--shards', type=int,
+		default=int(os.environ.get('SHARD_COUNT', 1)))
+	parser.add_argument('--shard', type=int, default=None,
+		help="only print this shard's classes (1 based), one per line")
+	parser.add_argument('--json', action='store_true',
+		help="print the full assignment as JSON")
+	args = parser.parse_args(argv)
+
+	sys.path.insert(0, os.getcwd())
+	ShardScheduler.import_tests(args.tests)
+	assignment = ShardScheduler.assign(args.shards)
+
+	if args.shard is not None:
+		for key in assignment[args.shard - 1]['classes']:
+			print key
+	elif args.json:
+		print json.dumps(assignment, indent=1)
+	else:
+		for index, shard in enumerate(assignment):
+			print "shard {} ({:.0f}s): {}".format(index + 1, shard['seconds'],
+				" ".join(shard['classes']))
+
+if __name__ == '__main__':
+	# run from the imported module, that's the registry @browsers uses
+	from automations.sharding import main
+	main()
@@ -5,6 +5,7 @@ except ImportError:
 import functools
 import logging
 import os
+import time
 import traceback
 import unittest
 from datetime import datetime as dt
@@ -22,6 +23,7 @@ from automations.pages.dashboard import DashboardPage
 #from automations.pages.widget import Widget
 from automations.pages.evpn import EvpnPage
 from automations.random_support import RandomSupport
+from automations.sharding import ClassDurations
 from automations.utils.log import Log
 
 logger = logging.getLogger("LOG") # outputs to main console during Jenkins runs
@@ -74,15 +76,20 @@ class TestCase(unittest.TestCase, Automation, DriverSupport,
 	def setUpClass(cls):
 		"""Class setup.
 		"""
+		start = time.time()
 		super(TestCase, cls).setUpClass()
 		cls.setUpAutomationClass()
+		# test and fixture durations feed the shard scheduler
+		ClassDurations.record(cls, time.time() - start)
 
 	@classmethod
 	def tearDownClass(cls):
 		"""Class teardown.
 		"""
+		start = time.time()
 		cls.tearDownAutomationClass()
 		super(TestCase, cls).tearDownClass()
+		ClassDurations.record(cls, time.time() - start)
 
 	###########################################################################
 	### Run setup/teardown
@@ -99,7 +106,10 @@ class TestCase(unittest.TestCase, Automation, DriverSupport,
 		"""Supplements the super class `run()`.
 		"""
 		self.current_result = result
+		start = time.time()
 		super(TestCase, self).run(result)
+		ClassDurations.record(type(self), time.time() - start,
+			test=self._testMethodName)
 
 	def cleanup(self):
 		"""Test cleaup (teardown).
@@ -0,0 +1,155 @@
+import unittest
+
+import mock
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from automations.core import action_batch
+from automations.core.element import Element
+from automations.core.retry import RetryPolicy
+
+
+class Driver(object):
+	"""Records what reaches the browser, in order.
+	"""
+
+	driver_name = "Test"
+	w3c = False
+
+	def __init__(self):
+		self.performed = []
+
+	def execute_script(self, script, *args):
+		self.performed.append(('focus', args[0].name))
+
+
+class WebElement(object):
+
+	def __init__(self, driver, name):
+		self.driver = driver
+		self.name = name
+		self.selected = False
+
+	def click(self):
+		self.driver.performed.append(('click', self.name))
+		self.selected = not self.selected
+
+	def clear(self):
+		self.driver.performed.append(('clear', self.name))
+
+	def is_selected(self):
+		return self.selected
+
+	def is_displayed(self):
+		return True
+
+
+class Chain(object):
+	"""ActionChains stand in, performs onto the fake web elements.
+	"""
+
+	def __init__(self, driver):
+		self.driver = driver
+		self.steps = []
+
+	def click(self, web_element):
+		self.steps.append(web_element.click)
+		return self
+
+	def send_keys(self, *keys):
+		self.steps.append(lambda: self.driver.performed.append(
+			('send_keys', "".join(keys))))
+		return self
+
+	def perform(self):
+		for step in self.steps:
+			step()
+
+
+class ActionBatchTests(unittest.TestCase):
+	"""Queueing actions and keeping their order.
+	"""
+
+	def setUp(self):
+		self.driver = Driver()
+		self.web_elements = {}
+		self.verified = []
+		self.fail_verify = set()
+		self.patches = [
+			mock.patch.object(action_batch, 'ActionChains', Chain),
+			mock.patch.object(Element, 'verify', autospec=True,
+				side_effect=self.verify)
+		]
+		for patch in self.patches:
+			patch.start()
+		self.first = self.element("First")
+		self.second = self.element("Second")
+
+	def tearDown(self):
+		for patch in self.patches:
+			patch.stop()
+
+	def element(self, name):
+		self.web_elements[name] = WebElement(self.driver, name)
+		return Element(self.driver, By.ID, name.lower(), name=name)
+
+	def verify(self, element, timeout=None):
+		self.verified.append(element.name)
+		if element.name in self.fail_verify:
+			self.fail_verify.remove(element.name)
+			raise WebDriverException("stale")
+		element.web_element = self.web_elements[element.name]
+		return element
+
+	def test_located_when_performed(self):
+		with self.first.batch():
+			self.first.click()
+			self.second.send_keys("ab")
+			self.assertEqual(self.verified, [])
+			self.assertEqual(self.driver.performed, [])
+		self.assertEqual(self.verified, ["First", "Second"])
+		self.assertEqual(self.driver.performed, [('click', "First"),
+			('focus', "Second"), ('send_keys', "ab")])
+
+	def test_unbatched_action_keeps_order(self):
+		with self.first.batch():
+			self.first.click()
+			self.second.clear()
+			self.second.click()
+		self.assertEqual(self.driver.performed, [('click', "First"),
+			('clear', "Second"), ('click', "Second")])
+
+	def test_set_checkbox(self):
+		with self.first.batch():
+			self.first.click()
+			self.second.set_checkbox(True)
+			self.second.set_checkbox(True)
+		self.assertEqual(self.driver.performed, [('click', "First"),
+			('click', "Second")])
+		self.assertTrue(self.web_elements["Second"].selected)
+
+	def test_replay_before_unbatched_action(self):
+		# nothing sent when the batch can't be located, replayed one by one
+		self.fail_verify.add("First")
+		with self.first.batch():
+			self.first.click()
+			self.second.clear()
+			self.second.click()
+		self.assertEqual(self.driver.performed, [('click', "First"),
+			('clear', "Second"), ('click', "Second")])
+
+	def test_retry_policy_per_call(self):
+		policy = RetryPolicy(attempts=1)
+		with mock.patch.object(Element, '_perform_action',
+			autospec=True) as perform:
+			self.second.set_checkbox(True, ignore_fail=True, retry=policy)
+			self.first.move_to(retry=policy)
+			self.first.drag_to(self.second, retry=policy)
+			# replayed batch actions keep their policy
+			self.fail_verify.add("First")
+			with self.first.batch():
+				self.first.click(retry=policy)
+		self.assertEqual([kwargs['name'] for _, kwargs
+			in perform.call_args_list], ['click', 'move_to', 'drag_to', 'click'])
+		self.assertTrue(all(kwargs['retry'] is policy for _, kwargs
+			in perform.call_args_list))
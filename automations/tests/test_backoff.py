@@ -0,0 +1,29 @@
+import unittest
+
+from automations.utils.backoff import Backoff
+
+
+class BackoffTests(unittest.TestCase):
+	"""Exponential backoff delays.
+	"""
+
+	def test_sequence(self):
+		backoff = Backoff(0.5, factor=2.0)
+		self.assertEqual([backoff.next() for _ in range(4)], [0.5, 1, 2, 4])
+
+	def test_maximum(self):
+		backoff = Backoff(0.25, factor=3.0, maximum=1.0)
+		self.assertEqual([backoff.next() for _ in range(4)], [0.25, 0.75, 1, 1])
+
+	def test_reset(self):
+		backoff = Backoff(1.0, factor=2.0)
+		backoff.next()
+		backoff.next()
+		backoff.reset()
+		self.assertEqual(backoff.next(), 1.0)
+
+	def test_jitter_bounds(self):
+		backoff = Backoff(1.0, factor=1.0, jitter=0.25)
+		delays = [backoff.next() for _ in range(200)]
+		self.assertTrue(all(0.75 <= delay <= 1.25 for delay in delays))
+		self.assertGreater(len(set(delays)), 1)
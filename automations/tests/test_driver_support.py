@@ -0,0 +1,148 @@
+import imp
+import os
+import unittest
+
+import mock
+
+from automations import config, driver_support
+from automations.core import page_timing
+from automations.core.page_timing import PageTiming
+from automations.driver_support import DriverSupport
+
+
+def load_defaults(module):
+	"""Load a separate copy of a module with none of it's env vars set.
+	"""
+	path = os.path.splitext(module.__file__)[0] + ".py"
+	with mock.patch.dict(os.environ, clear=True):
+		return imp.load_source("defaults_" + module.__name__.replace('.', '_'),
+			path)
+
+
+class DefaultsTests(unittest.TestCase):
+	"""Optimisations that are on unless disabled by env var.
+	"""
+
+	def test_config_defaults(self):
+		defaults = load_defaults(config).config['default']
+		self.assertTrue(defaults['shared_chromedriver'])
+		self.assertTrue(defaults['pooled_transport'])
+		self.assertFalse(defaults['use_session_pool'])
+		self.assertFalse(defaults['profile_template'])
+
+	def test_page_timing_default(self):
+		self.assertTrue(load_defaults(page_timing).PAGE_TIMING)
+
+
+class LaunchTests(unittest.TestCase):
+	"""Local Chrome launches and the command transport.
+	"""
+
+	capabilities = {'browserName': 'chrome', 'version': '', 'platform': 'LINUX'}
+
+	def setUp(self):
+		self.support = DriverSupport.__new__(DriverSupport)
+		self.support.config = {'shared_chromedriver': True,
+			'pooled_transport': True, 'launch_attempts': 3,
+			'launch_backoff': 0.1}
+		self.patches = [mock.patch.object(driver_support, name)
+			for name in ('ChromeDriverService', 'PooledConnectionMixin',
+				'Metrics', 'webdriver')]
+		self.patches.append(mock.patch.object(driver_support.Backoff, 'sleep'))
+		(self.service, self.transport, _, self.webdriver, _) = \
+			[patch.start() for patch in self.patches]
+
+	def tearDown(self):
+		for patch in self.patches:
+			patch.stop()
+
+	def test_shared_chromedriver(self):
+		driver = self.support.launch_chrome(self.capabilities, 'options')
+		session = self.service.instance.return_value.session
+		session.assert_called_once_with(self.capabilities, 'options')
+		self.assertIs(driver, session.return_value)
+		self.assertFalse(self.webdriver.Chrome.called)
+
+	def test_own_chromedriver(self):
+		self.support.config['shared_chromedriver'] = False
+		driver = self.support.launch_chrome(self.capabilities, 'options')
+		self.assertIs(driver, self.webdriver.Chrome.return_value)
+		self.assertFalse(self.service.instance.called)
+
+	def test_pooled_transport(self):
+		driver = self.support.launch_chrome(self.capabilities, 'options')
+		self.transport.install.assert_called_once_with(driver,
+			self.support.config)
+
+	def test_default_transport(self):
+		self.support.config['pooled_transport'] = False
+		self.support.launch_chrome(self.capabilities, 'options')
+		self.assertFalse(self.transport.install.called)
+
+	def test_launch_retries(self):
+		session = self.service.instance.return_value.session
+		session.side_effect = [IOError("refused"), 'driver']
+		self.assertEqual(self.support.launch_chrome(self.capabilities,
+			'options'), 'driver')
+		self.assertEqual(session.call_count, 2)
+
+	def test_launch_fails_after_attempts(self):
+		session = self.service.instance.return_value.session
+		session.side_effect = IOError("refused")
+		self.assertRaises(IOError, self.support.launch_chrome,
+			self.capabilities, 'options')
+		self.assertEqual(session.call_count, 3)
+		self.assertFalse(self.transport.install.called)
+
+
+class FilteredConsole(DriverSupport):
+	"""Overrides the console output per driver.
+	"""
+
+	def log_browser_console(self, driver, driver_name):
+		self.logged.append((driver_name, driver))
+
+
+class ConsoleTests(unittest.TestCase):
+	"""Reading the JS consoles of every driver.
+	"""
+
+	def test_log_browser_console_override(self):
+		support = FilteredConsole.__new__(FilteredConsole)
+		support.config = {'teardown_concurrency': 0, 'teardown_timeout': 5}
+		support.requested_drivers = set(['Agent', 'Visitor', 'Closed'])
+		support.Agent = 'agent driver'
+		support.Visitor = 'visitor driver'
+		support.Closed = None
+		support.logged = []
+		for name in ('log_info', 'log_separator', 'log_info_end'):
+			setattr(support, name, mock.Mock())
+		support.log_all_consoles()
+		self.assertEqual(sorted(support.logged), [('Agent', 'agent driver'),
+			('Visitor', 'visitor driver')])
+
+
+class PageTimingTests(unittest.TestCase):
+	"""Page load timing capture.
+	"""
+
+	def driver(self):
+		driver = mock.Mock(spec=['execute_script', 'execute', 'capabilities'])
+		driver.capabilities = {'browserName': 'firefox'}
+		driver.execute_script.return_value = {'ttfb': 100}
+		return driver
+
+	def test_capture(self):
+		driver = self.driver()
+		with mock.patch.object(page_timing, 'PAGE_TIMING', True):
+			record = PageTiming.capture(driver, "http://a", 1.23456)
+		self.assertEqual(record, {'url': "http://a", 'elapsed': 1.235,
+			'navigation': {'ttfb': 100}})
+		self.assertEqual(PageTiming.take(driver), [record])
+		self.assertEqual(PageTiming.take(driver), [])
+
+	def test_disabled(self):
+		driver = self.driver()
+		with mock.patch.object(page_timing, 'PAGE_TIMING', False):
+			self.assertIsNone(PageTiming.capture(driver, "http://a", 1.0))
+		self.assertFalse(driver.execute_script.called)
@@ -0,0 +1,64 @@
+import unittest
+
+import mock
+from selenium.common.exceptions import (
+	NoSuchElementException,
+	StaleElementReferenceException,
+	TimeoutException,
+	WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+from automations.core.element import Elements
+
+
+class ElementsReadTests(unittest.TestCase):
+	"""Bulk reads of list elements.
+	"""
+
+	def setUp(self):
+		self.driver = mock.Mock()
+		self.elements = Elements(self.driver, By.CSS_SELECTOR, "li", name="Items")
+		self.finds = []
+		self.patch = mock.patch.object(Elements, '_find', autospec=True,
+			side_effect=self.find)
+		self.patch.start()
+
+	def tearDown(self):
+		self.patch.stop()
+
+	def find(self, elements, timeout=None):
+		self.finds.append(timeout)
+		elements.web_elements = ["item {}".format(len(self.finds))]
+		return elements
+
+	def test_read(self):
+		self.driver.execute_script.return_value = ["a"]
+		self.assertEqual(self.elements.texts(), ["a"])
+		self.assertEqual(self.driver.execute_script.call_args[0][1:],
+			(["item 1"], 'text', None))
+
+	def test_not_found(self):
+		for ex in (NoSuchElementException("none"), TimeoutException("none")):
+			with mock.patch.object(Elements, '_find', side_effect=ex):
+				self.assertEqual(self.elements.texts(), [])
+		self.assertFalse(self.driver.execute_script.called)
+
+	def test_driver_failure_raised(self):
+		with mock.patch.object(Elements, '_find',
+			side_effect=WebDriverException("session deleted")):
+			self.assertRaises(WebDriverException, self.elements.texts)
+
+	def test_stale_found_again(self):
+		self.driver.execute_script.side_effect = [
+			StaleElementReferenceException("stale"), ["b"]]
+		self.assertEqual(self.elements.attributes("href"), ["b"])
+		self.assertEqual(len(self.finds), 2)
+		self.assertEqual(self.driver.execute_script.call_args[0][1:],
+			(["item 2"], 'attribute', "href"))
+
+	def test_stale_twice_raised(self):
+		self.driver.execute_script.side_effect = \
+			StaleElementReferenceException("stale")
+		self.assertRaises(StaleElementReferenceException, self.elements.rects)
+		self.assertEqual(len(self.finds), 2)
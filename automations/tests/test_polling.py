@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from automations.core import polling
+from automations.core.polling import PollHistory, PollScheduler
+
+
+class PollingTestCase(unittest.TestCase):
+	"""Runs against an empty history file.
+	"""
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "poll_history.json")
+		self.patch = mock.patch.object(polling, 'HISTORY_PATH', self.path)
+		self.patch.start()
+		self.reset()
+
+	def tearDown(self):
+		self.patch.stop()
+		self.reset()
+		shutil.rmtree(self.directory)
+
+	@staticmethod
+	def reset():
+		PollHistory._history = None
+		PollHistory._recorded = {}
+
+
+class PollHistoryTests(PollingTestCase):
+	"""Wait resolution history.
+	"""
+
+	def test_typical(self):
+		self.assertIsNone(PollHistory.typical('key'))
+		for elapsed in (0.5, 3.0, 1.0):
+			PollHistory.record('key', elapsed)
+		self.assertEqual(PollHistory.typical('key'), 1.0)
+
+	def test_samples_limited(self):
+		with mock.patch.object(PollHistory, 'samples', 3):
+			for elapsed in range(5):
+				PollHistory.record('key', elapsed)
+			self.assertEqual(PollHistory._history['key'], [2, 3, 4])
+
+	def test_regression_warning(self):
+		for _ in range(PollHistory.min_samples):
+			PollHistory.record('key', 1.0)
+		with mock.patch.object(polling.Log, 'logger') as logger:
+			PollHistory.record('key', 2.5)
+			self.assertFalse(logger.warn.called)
+			PollHistory.record('key', 4.0)
+			self.assertTrue(logger.warn.called)
+
+	def test_save_merges(self):
+		with open(self.path, 'w') as history_file:
+			json.dump({'key': [1.0, 2.0], 'other': [5.0]}, history_file)
+		PollHistory.record('key', 3.0)
+		with mock.patch.object(PollHistory, 'samples', 2):
+			PollHistory.save()
+		with open(self.path) as history_file:
+			self.assertEqual(json.load(history_file),
+				{'key': [2.0, 3.0], 'other': [5.0]})
+		self.assertEqual(PollHistory._recorded, {})
+
+
+class PollSchedulerTests(PollingTestCase):
+	"""Adaptive wait ticks.
+	"""
+
+	def setUp(self):
+		super(PollSchedulerTests, self).setUp()
+		self.jitter = mock.patch.object(PollScheduler, 'jitter', 0)
+		self.jitter.start()
+
+	def tearDown(self):
+		self.jitter.stop()
+		super(PollSchedulerTests, self).tearDown()
+
+	def test_backs_off_from_initial(self):
+		scheduler = PollScheduler()
+		ticks = [scheduler.next_tick() for _ in range(12)]
+		self.assertEqual(ticks[0], PollScheduler.initial)
+		self.assertEqual(ticks[1], PollScheduler.initial * PollScheduler.factor)
+		self.assertEqual(ticks[-1], PollScheduler.maximum)
+		self.assertEqual(ticks, sorted(ticks))
+
+	def test_first_tick_from_history(self):
+		for _ in range(3):
+			PollHistory.record('slow', 2.0)
+			PollHistory.record('fast', 0.01)
+			PollHistory.record('very slow', 60.0)
+		self.assertEqual(PollScheduler('slow').next_tick(), 0.5)
+		self.assertEqual(PollScheduler('fast').next_tick(),
+			PollScheduler.initial)
+		self.assertEqual(PollScheduler('very slow').next_tick(),
+			PollScheduler.maximum)
+		self.assertEqual(PollScheduler('unknown').next_tick(),
+			PollScheduler.initial)
+
+	def test_resolved_records_history(self):
+		scheduler = PollScheduler('key')
+		scheduler.resolved()
+		self.assertEqual(len(PollHistory._recorded['key']), 1)
+		PollScheduler().resolved()
+		self.assertEqual(list(PollHistory._recorded), ['key'])
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from automations.core import retry
+from automations.core.retry import RetryPolicy, RetryStats
+
+
+class Node(object):
+	"""Minimal element chain for policy resolution.
+	"""
+
+	def __init__(self, parent=None, container=None, retry_policy=None,
+		description=None):
+		self.parent = parent
+		self._container = container
+		self.description = description
+		self.name = description
+		if retry_policy:
+			self.retry_policy = retry_policy
+
+
+class RetryPolicyTests(unittest.TestCase):
+	"""Retry policy resolution and settings.
+	"""
+
+	def test_default(self):
+		self.assertIs(RetryPolicy.resolve(Node()), RetryPolicy.default)
+		self.assertEqual(RetryPolicy.default.attempts, 3)
+
+	def test_resolution_order(self):
+		section = RetryPolicy(attempts=4)
+		element = RetryPolicy(attempts=5)
+		call = RetryPolicy(attempts=6)
+		parent = Node(retry_policy=section)
+		self.assertIs(RetryPolicy.resolve(Node(parent=parent)), section)
+		self.assertIs(RetryPolicy.resolve(Node(parent=parent,
+			retry_policy=element)), element)
+		self.assertIs(RetryPolicy.resolve(Node(parent=parent,
+			retry_policy=element), policy=call), call)
+
+	def test_container_before_parent(self):
+		# a combined selector's parent is no longer the defining section
+		section = RetryPolicy(attempts=4)
+		node = Node(parent=Node(), container=Node(retry_policy=section))
+		self.assertIs(RetryPolicy.resolve(node), section)
+
+	def test_action_override(self):
+		click = RetryPolicy(attempts=5)
+		policy = RetryPolicy(actions={'click': click})
+		node = Node(retry_policy=policy)
+		self.assertIs(RetryPolicy.resolve(node, 'click'), click)
+		self.assertIs(RetryPolicy.resolve(node, 'set_text'), policy)
+
+	def test_retryable(self):
+		policy = RetryPolicy(retry_on=(StaleElementReferenceException,))
+		self.assertTrue(policy.retryable(StaleElementReferenceException()))
+		self.assertFalse(policy.retryable(TimeoutException()))
+
+	def test_backoff(self):
+		self.assertEqual(RetryPolicy(attempts=0).attempts, 1)
+		backoff = RetryPolicy(delay=0.5, factor=2.0, maximum=1.5).backoff()
+		self.assertEqual([backoff.next() for _ in range(3)], [0.5, 1.0, 1.5])
+
+
+class RetryStatsTests(unittest.TestCase):
+	"""Retry counters and their merge into the statistics file.
+	"""
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "retry_stats.json")
+		self.patch = mock.patch.object(retry, 'STATS_PATH', self.path)
+		self.patch.start()
+		RetryStats._stats = {}
+
+	def tearDown(self):
+		self.patch.stop()
+		RetryStats._stats = {}
+		shutil.rmtree(self.directory)
+
+	def test_record(self):
+		element = Node(description="[Email]")
+		RetryStats.record(element, 'click', 0, 0.1)
+		self.assertEqual(RetryStats.snapshot(), {})
+		RetryStats.record(element, 'click', 2, 1.5)
+		RetryStats.record(element, 'set_text', 1, 0.5, failed=True)
+		self.assertEqual(RetryStats.snapshot(), {'[Email]': {'retries': 3,
+			'recovered': 1, 'failed': 1, 'seconds': 2.0,
+			'actions': {'click': 2, 'set_text': 1}}})
+
+	def test_save_merges(self):
+		with open(self.path, 'w') as stats_file:
+			json.dump({'[Email]': {'retries': 1, 'recovered': 1, 'failed': 0,
+				'seconds': 1.0, 'actions': {'click': 1}}}, stats_file)
+		RetryStats.record(Node(description="[Email]"), 'click', 2, 0.5)
+		RetryStats.save()
+		with open(self.path) as stats_file:
+			self.assertEqual(json.load(stats_file), {'[Email]': {'retries': 3,
+				'recovered': 2, 'failed': 0, 'seconds': 1.5,
+				'actions': {'click': 3}}})
+		self.assertEqual(RetryStats.snapshot(), {})
@@ -0,0 +1,106 @@
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from automations.core.element import Page, Section
+from automations.core.locator import Locator
+from automations.core.selectors import SelectorCompiler
+
+
+class Panel(Section):
+
+	def setup(self):
+		self.field = self.element_by_selector("input.x", "Field")
+
+
+class SelectorCompilerTests(unittest.TestCase):
+	"""Flattening parent/child selectors.
+	"""
+
+	def test_css_pairs_combine_to_css(self):
+		self.assertEqual(SelectorCompiler.combine(By.CSS_SELECTOR, "div.panel",
+			By.CSS_SELECTOR, "a > span"),
+			(By.CSS_SELECTOR, "div.panel a > span"))
+		self.assertEqual(SelectorCompiler.combine(By.ID, "main",
+			By.CLASS_NAME, "row"), (By.CSS_SELECTOR, "#main .row"))
+		self.assertEqual(SelectorCompiler.combine(By.TAG_NAME, "form",
+			By.NAME, "email"), (By.CSS_SELECTOR, "form [name='email']"))
+
+	def test_css_group_is_not_combined(self):
+		self.assertIsNone(SelectorCompiler.combine(By.CSS_SELECTOR, "a, b",
+			By.CSS_SELECTOR, "span"))
+		self.assertIsNone(SelectorCompiler.combine(By.ID, "main",
+			By.CSS_SELECTOR, "a, b"))
+
+	def test_xpath_child_of_unique_parent(self):
+		self.assertEqual(SelectorCompiler.combine(By.ID, "main",
+			By.XPATH, ".//a[@href]"), (By.XPATH, ".//*[@id='main']//a[@href]"))
+		self.assertEqual(SelectorCompiler.combine(By.XPATH,
+			"//div[@id='main']", By.XPATH, "span"),
+			(By.XPATH, "//div[@id='main']/span"))
+		self.assertEqual(SelectorCompiler.combine(By.XPATH,
+			"//div[@id='main']", By.CSS_SELECTOR, "ul > li.item"),
+			(By.XPATH, "//div[@id='main']//ul/li"
+				"[contains(concat(' ', normalize-space(@class), ' '), ' item ')]"))
+
+	def test_xpath_needs_unique_parent(self):
+		# "first div, then it's span" must not become "any div's span"
+		self.assertIsNone(SelectorCompiler.combine(By.XPATH, "//div",
+			By.XPATH, "span"))
+		self.assertIsNone(SelectorCompiler.combine(By.CSS_SELECTOR,
+			"div.panel", By.XPATH, "span"))
+
+	def test_xpath_child_leaving_parent_subtree(self):
+		for child in ("..", "../span", "following-sibling::span",
+			"ancestor::form", "//span", "(.//span)[1]", "a | b"):
+			self.assertIsNone(SelectorCompiler.combine(By.ID, "main",
+				By.XPATH, child), child)
+
+	def test_is_unique(self):
+		self.assertTrue(SelectorCompiler.is_unique(By.ID, "main"))
+		self.assertTrue(SelectorCompiler.is_unique(By.CSS_SELECTOR,
+			"div > form#signin"))
+		self.assertTrue(SelectorCompiler.is_unique(By.XPATH,
+			"//form[@id='signin']"))
+		self.assertFalse(SelectorCompiler.is_unique(By.CSS_SELECTOR,
+			"#signin input"))
+		self.assertFalse(SelectorCompiler.is_unique(By.XPATH,
+			"//form[@id='signin']/input"))
+		self.assertFalse(SelectorCompiler.is_unique(By.XPATH,
+			"//a[@id='x'] | //b[@id='y']"))
+		self.assertFalse(SelectorCompiler.is_unique(By.NAME, "email"))
+
+	def test_css_to_xpath(self):
+		self.assertEqual(SelectorCompiler.css_to_xpath("div#main > a[href^='/x']"),
+			".//div[@id='main']/a[starts-with(@href, '/x')]")
+		self.assertEqual(SelectorCompiler.css_to_xpath("input[name=\"q\"]"),
+			".//input[@name='q']")
+		self.assertIsNone(SelectorCompiler.css_to_xpath("a:hover"))
+		self.assertIsNone(SelectorCompiler.css_to_xpath("a + b"))
+		self.assertIsNone(SelectorCompiler.css_to_xpath("> a"))
+
+
+class SectionFlatteningTests(unittest.TestCase):
+	"""Flattening children into the sections defining them.
+	"""
+
+	def setUp(self):
+		self.page = Page(None, None, "Page")
+
+	def test_condition_chained_after_section(self):
+		panel = self.page.section_by_selector(Panel(None), "div.panel",
+			"Panel").visible()
+		locator = Locator.for_element(panel.field)
+		self.assertEqual(panel.field.value, "input.x")
+		self.assertIs(panel.field.parent, panel)
+		self.assertEqual(locator.levels, [panel, panel.field])
+
+	def test_flattened_on_first_lookup(self):
+		panel = self.page.section_by_selector(Panel(None), "div.panel",
+			"Panel")
+		self.assertEqual(panel.field.value, "input.x")
+		locator = Locator.for_element(panel.field)
+		self.assertEqual(panel.field.value, "div.panel input.x")
+		self.assertIs(panel.field.parent, self.page)
+		self.assertIs(panel.field._container, panel)
+		self.assertEqual(locator.levels, [panel.field])
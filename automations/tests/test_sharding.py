@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from automations import sharding
+from automations.sharding import ClassDurations, ShardScheduler
+
+
+class LoginTests(object):
+	pass
+
+
+class ClassDurationsTests(unittest.TestCase):
+	"""Per-test durations and their merge into the durations file.
+	"""
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "class_durations.json")
+		self.patch = mock.patch.object(sharding, 'DURATIONS_PATH', self.path)
+		self.patch.start()
+		ClassDurations._runs = {}
+
+	def tearDown(self):
+		self.patch.stop()
+		ClassDurations._runs = {}
+		shutil.rmtree(self.directory)
+
+	def test_class_id(self):
+		key = ClassDurations.class_id(LoginTests)
+		self.assertEqual(key, __name__ + ":LoginTests")
+		self.assertEqual(ClassDurations.class_id(LoginTests, 'test_a'),
+			key + ".test_a")
+		self.assertEqual(ClassDurations.class_of(key + ".test_a"), key)
+		self.assertEqual(ClassDurations.class_of(key), key)
+
+	def test_totals(self):
+		durations = {
+			'a.b:One': {'seconds': 5.0, 'runs': 1},
+			'a.b:One.test_x': {'seconds': 10.0, 'runs': 1},
+			'a.b:One.test_y': {'seconds': 20.0, 'runs': 2},
+			'a.b:Two.test_x': {'seconds': 1.5, 'runs': 1}
+		}
+		self.assertEqual(ClassDurations.totals(durations),
+			{'a.b:One': 35.0, 'a.b:Two': 1.5})
+
+	def test_save_merges_moving_average(self):
+		key = ClassDurations.class_id(LoginTests)
+		with open(self.path, 'w') as durations_file:
+			json.dump({key: {'seconds': 10.0, 'runs': 3}}, durations_file)
+		ClassDurations.record(LoginTests, 2.0)
+		ClassDurations.record(LoginTests, 4.0)
+		ClassDurations.record(LoginTests, 3.0, test='test_a')
+		ClassDurations.save()
+		self.assertEqual(ClassDurations.load(), {
+			key: {'seconds': 8.0, 'runs': 4},
+			key + ".test_a": {'seconds': 3.0, 'runs': 1}
+		})
+		self.assertEqual(ClassDurations._runs, {})
+
+
+class ShardSchedulerTests(unittest.TestCase):
+	"""Estimating class durations and balancing them across shards.
+	"""
+
+	def test_estimates(self):
+		classes = {'m:A': 'chrome', 'm:B': 'chrome', 'm:C': 'chrome',
+			'm:D': 'firefox', 'm:E': 'safari'}
+		durations = {
+			'm:A.test': {'seconds': 10.0, 'runs': 1},
+			'm:B.test': {'seconds': 30.0, 'runs': 1},
+			'm:D': {'seconds': 1.0, 'runs': 1},
+			'm:D.test': {'seconds': 59.0, 'runs': 1},
+			'm:Gone.test': {'seconds': 100.0, 'runs': 1}
+		}
+		self.assertEqual(ShardScheduler.estimates(classes, durations), {
+			'm:A': 10.0, 'm:B': 30.0, 'm:D': 60.0,
+			# same browser average, then the average of all known classes
+			'm:C': 20.0, 'm:E': 100.0 / 3
+		})
+
+	def test_estimates_without_history(self):
+		self.assertEqual(ShardScheduler.estimates({'m:A': 'chrome'}, {}),
+			{'m:A': sharding.DEFAULT_SECONDS})
+
+	def test_assign_longest_first(self):
+		estimates = {'a': 8.0, 'b': 7.0, 'c': 6.0, 'd': 5.0, 'e': 4.0}
+		assignment = ShardScheduler.assign(2, estimates)
+		self.assertEqual(assignment, [
+			{'classes': ['a', 'd', 'e'], 'seconds': 17.0},
+			{'classes': ['b', 'c'], 'seconds': 13.0}
+		])
+
+	def test_assign_covers_every_class_once(self):
+		estimates = dict(("m:C{}".format(i), float(i % 7 + 1))
+			for i in range(40))
+		assignment = ShardScheduler.assign(3, estimates)
+		assigned = sum((shard['classes'] for shard in assignment), [])
+		self.assertEqual(sorted(assigned), sorted(estimates))
+		seconds = [shard['seconds'] for shard in assignment]
+		self.assertLessEqual(max(seconds) - min(seconds), max(estimates.values()))
+
+	def test_assign_needs_a_shard(self):
+		self.assertRaises(ValueError, ShardScheduler.assign, 0, {})
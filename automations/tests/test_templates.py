@@ -0,0 +1,112 @@
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from automations.core.element import Element, Section
+from automations.core.templates import LocatorTemplate
+
+
+class Form(Element):
+	"""Element with children defined in setup, counting setup() calls.
+	"""
+
+	setups = 0
+
+	def setup(self):
+		type(self).setups += 1
+		self.email = self.element_by_selector("input[name=email]", "Email")
+		self.send = self.element_by_selector("button", "Send").visible()
+		self.button = self.send
+		self.label = "Sign in"
+
+
+class CachedForm(Form):
+
+	cache_setup = True
+	setups = 0
+
+
+class UntemplatableForm(Form):
+
+	cache_setup = True
+	setups = 0
+
+	def setup(self):
+		super(UntemplatableForm, self).setup()
+		self.handlers = [lambda: None]
+
+
+class SignIn(Section):
+
+	setups = 0
+
+	def setup(self):
+		type(self).setups += 1
+		self.form = self.element("signin", "Form")
+
+
+class LocatorTemplateTests(unittest.TestCase):
+	"""Capturing and binding setup() templates.
+	"""
+
+	def setUp(self):
+		LocatorTemplate._templates.clear()
+		for form_class in (Form, CachedForm, UntemplatableForm, SignIn):
+			form_class.setups = 0
+
+	def tearDown(self):
+		LocatorTemplate._templates.clear()
+
+	def test_setup_not_cached_by_default(self):
+		self.assertFalse(Form.cache_setup)
+		self.assertFalse(SignIn.cache_setup)
+		Form(None, By.ID, "a", name="A")
+		Form(None, By.ID, "a", name="A")
+		SignIn(None)
+		SignIn(None)
+		self.assertEqual(Form.setups, 2)
+		self.assertEqual(SignIn.setups, 2)
+		self.assertEqual(LocatorTemplate._templates, {})
+
+	def test_bound_instance_builds_elements(self):
+		first = CachedForm(None, By.ID, "a", name="A")
+		second = CachedForm("driver", By.ID, "a", name="A")
+		self.assertEqual(CachedForm.setups, 1)
+		self.assertIsNotNone(second._template)
+		self.assertNotIn('email', vars(second))
+
+		send = second.send
+		self.assertIs(send._container, second)
+		self.assertEqual(send.driver, "driver")
+		self.assertEqual((send.by, send.value, send.name),
+			(first.send.by, first.send.value, first.send.name))
+		self.assertEqual(send.conditions.description,
+			first.send.conditions.description)
+		self.assertIsNot(send.conditions, first.send.conditions)
+		self.assertIs(second.send, send)
+		self.assertEqual(second.label, "Sign in")
+
+	def test_alias_is_same_element(self):
+		CachedForm(None, By.ID, "a", name="A")
+		second = CachedForm(None, By.ID, "a", name="A")
+		self.assertIs(second.button, second.send)
+
+	def test_different_construction_runs_setup(self):
+		CachedForm(None, By.ID, "a", name="A")
+		other = CachedForm(None, By.ID, "b", name="B")
+		self.assertEqual(CachedForm.setups, 2)
+		self.assertIsNone(vars(other).get('_template'))
+		self.assertIn('email', vars(other))
+
+	def test_untemplatable_setup_always_runs(self):
+		UntemplatableForm(None, By.ID, "a", name="A")
+		UntemplatableForm(None, By.ID, "a", name="A")
+		self.assertEqual(UntemplatableForm.setups, 2)
+		self.assertIs(LocatorTemplate.for_class(UntemplatableForm), False)
+
+	def test_instance_key(self):
+		form = Form(None, By.ID, "a", name="A")
+		template = LocatorTemplate({}, {}, key=(By.ID, "a", "A"))
+		self.assertEqual(LocatorTemplate.instance_key(form), (By.ID, "a", "A"))
+		self.assertTrue(template.matches(form))
+		self.assertFalse(template.matches(Form(None, By.ID, "a", name="B")))
@@ -0,0 +1,54 @@
+import random
+import time
+
+
+class Backoff(object):
+	"""Exponential backoff delays with random jitter.
+
+	e.g. Backoff(0.05, factor=2, maximum=1) gives delays of roughly 0.05, 0.1,
+	0.2, 0.4, 0.8, 1, 1 ... each varied by up to +/- jitter (proportion).
+	"""
+
+	def __init__(self, initial, factor=2.0, maximum=None, jitter=0.0):
+		"""New backoff sequence.
+
+		Args:
+			initial (float): the first delay (seconds)
+			factor (float): multiplier applied after each delay
+			maximum (float): upper limit for the delay (seconds), None for no limit
+			jitter (float): proportion of each delay to randomly vary by
+		"""
+		self.initial = initial
+		self.factor = factor
+		self.maximum = maximum
+		self.jitter = jitter
+		self.reset()
+
+	def reset(self):
+		"""Restart the sequence from the initial delay.
+		"""
+		self.current = self.initial
+
+	def next(self):
+		"""Get the next delay in the sequence.
+
+		Returns:
+			float: the delay (seconds)
+		"""
+		delay = self.current
+		self.current = self.current * self.factor
+		if self.maximum is not None:
+			self.current = min(self.current, self.maximum)
+		if self.jitter:
+			delay = delay * (1 + random.uniform(-self.jitter, self.jitter))
+		return max(0, delay)
+
+	def sleep(self):
+		"""Sleep for the next delay in the sequence.
+
+		Returns:
+			float: the delay slept (seconds)
+		"""
+		delay = self.next()
+		time.sleep(delay)
+		return delay
@@ -0,0 +1,55 @@
+import os
+
+try:
+	import fcntl
+except ImportError:
+	# Windows
+	fcntl = None
+	import msvcrt
+
+
+class FileLock(object):
+	"""Exclusive lock between processes (e.g. nose multiprocess workers) held
+	on a '{path}.lock' file while a shared file is read, merged and written.
+
+	Usage:
+		with FileLock(path):
+			...
+	"""
+
+	def __init__(self, path):
+		"""New lock.
+
+		Args:
+			path (str): the file being protected
+		"""
+		self.path = path + ".lock"
+		self.lock_file = None
+
+	def __enter__(self):
+		directory = os.path.dirname(self.path)
+		if directory and not os.path.isdir(directory):
+			try:
+				os.makedirs(directory)
+			except OSError:
+				# created by another process
+				pass
+		self.lock_file = open(self.path, 'a')
+		if fcntl:
+			fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+		else:
+			self.lock_file.seek(0)
+			msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_LOCK, 1)
+		return self
+
+	def __exit__(self, exc_type, exc_value, trace):
+		try:
+			if fcntl:
+				fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+			else:
+				self.lock_file.seek(0)
+				msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+		finally:
+			self.lock_file.close()
+			self.lock_file = None
+		return False
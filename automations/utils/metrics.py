@@ -0,0 +1,130 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from automations.utils.log import Log
+
+"""Location of the metrics file (JSON lines), override with env var METRICS_PATH
+"""
+METRICS_PATH = os.environ.get('METRICS_PATH',
+	os.path.join(os.getcwd(), "output", "metrics.jsonl"))
+
+
+class Histogram(object):
+	"""Simple cumulative bucket histogram.
+	"""
+
+	# upper bounds (seconds), values above the last go in the overflow bucket
+	BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+	def __init__(self, buckets=BUCKETS):
+		self.buckets = tuple(buckets)
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.count = 0
+		self.total = 0.0
+		self.maximum = 0.0
+
+	def observe(self, value):
+		"""Add a value.
+		"""
+		index = len(self.buckets)
+		for i, bound in enumerate(self.buckets):
+			if value <= bound:
+				index = i
+				break
+		self.counts[index] += 1
+		self.count += 1
+		self.total += value
+		self.maximum = max(self.maximum, value)
+
+	def to_dict(self):
+		"""Get the histogram as a JSON friendly dict.
+		"""
+		labels = ["<={}".format(bound) for bound in self.buckets] + \
+			[">{}".format(self.buckets[-1])]
+		return {
+			'buckets': dict(zip(labels, self.counts)),
+			'count': self.count,
+			'sum': round(self.total, 3),
+			'max': round(self.maximum, 3)
+		}
+
+
+class Metrics(object):
+	"""Run metrics appended to a local JSON lines file, one event per line.
+
+	Events are written as they are recorded, histograms are aggregated in
+	process and written as 'histogram' events at exit.
+	"""
+
+	_lock = threading.Lock()
+	_histograms = {}
+
+	@classmethod
+	def record(cls, event, **fields):
+		"""Write an event.
+
+		Args:
+			event (str): the event type
+			fields (kwargs): the event data
+		"""
+		fields['type'] = event
+		fields['time'] = round(time.time(), 3)
+		fields['pid'] = os.getpid()
+		cls._write([fields])
+
+	@classmethod
+	def observe(cls, name, label, value):
+		"""Add a value to a histogram.
+
+		Args:
+			name (str): the histogram name, e.g. 'launch_seconds'
+			label (str): the series, e.g. the browser
+			value (float): the value
+		"""
+		with cls._lock:
+			histogram = cls._histograms.setdefault((name, label), Histogram())
+			histogram.observe(value)
+
+	@classmethod
+	def histograms(cls):
+		"""Get this process's histograms.
+
+		Returns:
+			{(str, str): dict}: histogram data by name and label
+		"""
+		with cls._lock:
+			return dict((key, histogram.to_dict())
+				for key, histogram in cls._histograms.items())
+
+	@classmethod
+	def flush(cls):
+		"""Write the histograms.
+		"""
+		now = round(time.time(), 3)
+		events = []
+		for (name, label), data in sorted(cls.histograms().items()):
+			data.update({'type': 'histogram', 'name': name, 'label': label,
+				'time': now, 'pid': os.getpid()})
+			events.append(data)
+		cls._write(events)
+
+	@classmethod
+	def _write(cls, events):
+		if not events:
+			return
+		lines = "".join(json.dumps(event, sort_keys=True, default=str) + "\n"
+			for event in events)
+		with cls._lock:
+			try:
+				directory = os.path.dirname(METRICS_PATH)
+				if not os.path.isdir(directory):
+					os.makedirs(directory)
+				with open(METRICS_PATH, 'a') as metrics_file:
+					metrics_file.write(lines)
+			except Exception as ex:
+				Log.logger.warn("Failed to write metrics: {}".format(ex))
+
+atexit.register(Metrics.flush)
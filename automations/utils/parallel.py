@@ -1,6 +1,21 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed, wait
   
 
+class ConcurrentError(Exception):
+        """Raised when one or more concurrent tasks fail.
+
+        Args:
+                errors ([(str, Exception)]): task description and exception
+                        for each failed task
+        """
+
+        def __init__(self, errors):
+                self.errors = errors
+                super(ConcurrentError, self).__init__("{} of the tasks failed: {}"
+                        .format(len(errors), "; ".join(u"{}: {!r}".format(task, ex)
+                                for task, ex in errors)))
+
+
 class Concurrent(object):
         """Simple concurrent task helper.
         """
@@ -23,21 +38,35 @@ class Concurrent(object):
                 """Run all registered tasks concurrently.
 
                 Args:
-                        threads (int)
+                        threads (int): max tasks run at once, defaults to all
+
+                Raises:
+                        ConcurrentError: with every failure if any task fails
                 """
                 if len(self.tasks) == 0:
                         return
 
-                thread_count = threads if threads is not None else len(self.tasks)
+                thread_count = threads if threads else len(self.tasks)
                 pool = ThreadPoolExecutor(thread_count)
                 futures = []
                 for task, args, kwargs in self.tasks:
                         futures.append(pool.submit(task, *args, **kwargs))
 
                 wait(futures)
+                pool.shutdown(wait=False)
 
-                for future in futures:
-                        future.result()
+                errors = []
+                for (task, args, _), future in zip(self.tasks, futures):
+                        if future.exception() is not None:
+                                errors.append((self._describe(task, args),
+                                        future.exception()))
 
                 # a task set should only run once
                 self.tasks = []
+                if errors:
+                        raise ConcurrentError(errors)
+
+        @staticmethod
+        def _describe(task, args):
+                name = getattr(task, '__name__', repr(task))
+                return u"{}({})".format(name, ", ".join(repr(arg) for arg in args))
@@ -0,0 +1,50 @@
+import json
+import os
+
+from automations.utils.file_lock import FileLock
+
+
+class SharedJson(object):
+	"""A local JSON file that concurrent workers merge their results into.
+
+	Usage:
+		SharedJson(path).merge(lambda data: dict(data, key=value))
+	"""
+
+	def __init__(self, path):
+		"""New shared file.
+
+		Args:
+			path (str): the JSON file
+		"""
+		self.path = path
+
+	def read(self):
+		"""Read the file.
+
+		Returns:
+			the data, {} if the file is missing or invalid
+		"""
+		try:
+			with open(self.path) as json_file:
+				return json.load(json_file)
+		except (IOError, OSError, ValueError):
+			return {}
+
+	def merge(self, merge, **dump_options):
+		"""Merge into the file while holding it's lock (see FileLock).
+
+		The result is written to a temp file which then replaces the file, so
+		readers never see a partial write.
+
+		Args:
+			merge (fn): called with the current data (see read), returns the
+				data to write
+			dump_options: json.dump options, e.g. indent
+		"""
+		with FileLock(self.path):
+			data = merge(self.read())
+			temp_path = "{}.{}".format(self.path, os.getpid())
+			with open(temp_path, 'w') as json_file:
+				json.dump(data, json_file, **dump_options)
+			os.rename(temp_path, self.path)